@@ -0,0 +1,5 @@
+"""Code shared by the A*, maze and sorting scripts.
+
+The scripts are run from their own directories, so each one puts the top of
+the repo on sys.path before importing from here.
+"""
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""Grid geometry shared by the scripts
+
+Filename: grid.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+All three scripts lay a grid of squares over the window.  A GridGeometry
+holds the window and square size, which grid_options() turns into click
+options so they are picked when a script runs rather than fixed at import,
+and draws the grid lines once into a cached surface for the scripts to
+blit.
+"""
+
+import functools
+
+import click
+import pygame
+
+
+class GridGeometry:
+    """ The window size in pixels and the size of its squares.
+
+    columns and rows count the whole squares that fit; max_x and max_y are
+    the last of them.  A script that puts squares at fixed places on the
+    grid asks for at least min_columns by min_rows of them.
+    """
+
+    def __init__(self, width, height, square_size, min_columns=1,
+                 min_rows=1):
+
+        if square_size <= 0 or width < square_size or height < square_size:
+            raise ValueError(f"A {width}x{height} window has no room for "
+                             f"{square_size} pixel squares")
+
+        self.width = width
+        self.height = height
+        self.square_size = square_size
+        self.columns = width // square_size
+        self.rows = height // square_size
+
+        if self.columns < min_columns or self.rows < min_rows:
+            raise ValueError(f"A {width}x{height} window only fits "
+                             f"{self.columns}x{self.rows} {square_size} pixel "
+                             f"squares, at least {min_columns}x{min_rows} "
+                             f"are needed")
+        self._lines = {}
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    @property
+    def max_x(self):
+        return self.columns - 1
+
+    @property
+    def max_y(self):
+        return self.rows - 1
+
+    def square_at(self, pos):
+        """ Get the square under a pixel position. """
+
+        return [int(pos[0] / self.square_size), int(pos[1] / self.square_size)]
+
+    def square_rect(self, square):
+        """ Get the rect of a square, including the grid lines on its top
+        and left. """
+
+        size = self.square_size
+        return pygame.Rect(square[0]*size, square[1]*size, size, size)
+
+    def lines(self, background, color, line_width=1, edges=False):
+        """ Get a window sized surface of the grid lines on background.
+
+        Each combination of arguments is drawn once and the surface is kept,
+        so don't draw on it.  With edges the lines along the top and left of
+        the window are drawn as well.
+        """
+
+        key = (background, color, line_width, edges)
+        if key not in self._lines:
+            surface = pygame.Surface(self.size)
+            surface.fill(background)
+
+            first = 0 if edges is True else 1
+            for i in range(first, self.columns):
+                x = self.square_size*i
+                pygame.draw.line(surface, color, (x, 0), (x, self.height),
+                                 line_width)
+
+            for i in range(first, self.rows):
+                y = self.square_size*i
+                pygame.draw.line(surface, color, (0, y), (self.width, y),
+                                 line_width)
+
+            self._lines[key] = surface
+
+        return self._lines[key]
+
+
+def grid_options(width, height, square_size, min_columns=1, min_rows=1):
+    """ Add --window-width, --window-height and --square-size options to a
+    click command, defaulting to the given sizes.  The command gets them as
+    a GridGeometry in its geometry argument, which has to have at least
+    min_columns by min_rows squares. """
+
+    def decorator(command):
+
+        @functools.wraps(command)
+        def wrapper(*args, window_width, window_height, square_size,
+                    **kwargs):
+            try:
+                geometry = GridGeometry(window_width, window_height,
+                                        square_size, min_columns, min_rows)
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint="--square-size")
+            return command(*args, geometry=geometry, **kwargs)
+
+        options = [
+            click.option("--window-width", type=int, default=width,
+                         help="Window width in pixels"),
+            click.option("--window-height", type=int, default=height,
+                         help="Window height in pixels"),
+            click.option("--square-size", type=int,
+                         default=square_size,
+                         help="Width and height of a grid square in pixels"),
+        ]
+        for option in reversed(options):
+            wrapper = option(wrapper)
+        return wrapper
+
+    return decorator
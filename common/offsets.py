@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+"""Neighbor offset tables
+
+Filename: offsets.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+The offsets to a square's neighbors for 4 and 8 connectivity, as used by the
+searches and the grid geometry.  Only numpy is needed, so the headless
+search tools and their worker processes don't load pygame.
+"""
+
+import functools
+
+import numpy as np
+
+# Neighbor offsets (dx, dy), in the same order get_neighbors used to walk them
+PLUS_OFFSETS = np.array([[-1, 0], [0, -1], [0, 1], [1, 0]])
+ALL_OFFSETS = np.array([[-1, -1], [-1, 0], [-1, 1],
+                        [0, -1], [0, 1],
+                        [1, -1], [1, 0], [1, 1]])
+
+
+def neighbor_offsets(plus_only=False):
+    """ Get the neighbor offsets for the given connectivity. """
+
+    return PLUS_OFFSETS if plus_only is True else ALL_OFFSETS
+
+
+@functools.lru_cache(maxsize=None)
+def flat_offsets(stride, plus_only=False):
+    """ Get the neighbor offsets into a flat array of columns stride long
+    (square (x, y) at x*stride + y), in the same order as
+    neighbor_offsets(). """
+
+    return tuple((neighbor_offsets(plus_only) @ [stride, 1]).tolist())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""Offscreen frame recorder
+
+Filename: recorder.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+Screen capturing the window drops frames and can't go faster than real
+time.  With --record the scripts draw into an offscreen surface under SDL's
+dummy video driver instead, as fast as they can, and hand every frame to a
+FrameRecorder.  A writer thread takes the frames off a bounded queue and
+writes them out, so rendering and disk I/O overlap and a slow disk holds up
+the rendering rather than piling up frames in memory.
+
+The path picks the format:
+
+    frames/%05d.png  a PNG sequence (a directory gets numbered PNGs in it)
+    out.rgb, -       raw RGB24 frames, to a file or stdout, e.g.
+
+    python sorting.py --record - | ffmpeg -f rawvideo -pix_fmt rgb24 \\
+        -s 800x800 -r 30 -i - sort.mp4
+"""
+
+import os
+import queue
+import sys
+import threading
+import pygame
+
+RAW_EXTENSIONS = (".rgb", ".raw")
+
+
+def use_dummy_driver():
+    """ Render without a window.  Has to be called before pygame.init(). """
+
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+
+class FrameRecorder:
+    """ Writes frames out from a background thread.
+
+    time() is the time in the recording, frames/fps, for a FrameScheduler
+    to run by so the recording plays back at the speed the animation would
+    have run at.
+    """
+
+    def __init__(self, path, fps=30, queue_size=64):
+
+        self.fps = fps
+        self.frames = 0
+        self.size = None
+
+        self._raw = path == "-" or path.endswith(RAW_EXTENSIONS)
+        if self._raw:
+            self._file = (sys.stdout.buffer if path == "-"
+                          else open(path, "wb"))
+        else:
+            if "%" not in path:
+                path = os.path.join(path, "%06d.png")
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._pattern = path
+
+        self._error = None
+        self._queue = queue.Queue(queue_size)
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def time(self):
+        return self.frames / self.fps
+
+    def add(self, surface):
+        """ Queue a copy of the surface's pixels as the next frame, waiting
+        if the queue is full. """
+
+        if self._error is not None:
+            raise self._error
+
+        size = surface.get_size()
+        if self.size is None:
+            self.size = size
+        elif size != self.size:
+            raise ValueError(f"Frame size {size} isn't {self.size}")
+
+        self._queue.put((self.frames, pygame.image.tobytes(surface, "RGB")))
+        self.frames += 1
+
+    def _write(self):
+        """ Write frames off the queue until the None at the end. """
+
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            if self._error is not None:
+                continue
+
+            number, pixels = frame
+            try:
+                if self._raw:
+                    self._file.write(pixels)
+                else:
+                    image = pygame.image.frombytes(pixels, self.size, "RGB")
+                    pygame.image.save(image, self._pattern % number)
+            except Exception as e:
+                # reported by the next add() or close(), the rest of the
+                # queue is just drained
+                self._error = e
+
+    def close(self):
+        """ Write out the frames still queued. """
+
+        self._queue.put(None)
+        self._thread.join()
+        if self._raw:
+            self._file.flush()
+            if self._file is not sys.stdout.buffer:
+                self._file.close()
+
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+"""Benchmark results output
+
+Filename: results.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+The headless benchmarks collect a dict per run and write them all out at
+the end, as json or csv.
+"""
+
+import csv
+import json
+
+
+def write_results(results, output, fmt, fields):
+    """ Write the results out as json or csv, with the csv columns in the
+    order of fields. """
+
+    if fmt == "csv":
+        writer = csv.DictWriter(output, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(results)
+    else:
+        json.dump(results, output, indent=2)
+        output.write("\n")
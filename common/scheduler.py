@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""Frame budget scheduler
+
+Filename: scheduler.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+The scripts used to step their algorithm once per frame at 30 frames a
+second, which takes hours to watch on anything big.  A FrameScheduler runs
+as many steps of an iterator as fit in a time budget each frame (or only as
+many as a target rate allows) and then hands back what they yielded, so the
+script can render once per frame whatever the speed.
+"""
+
+import time
+
+
+class FrameScheduler:
+    """ Steps an iterator for up to budget milliseconds a frame.
+
+    With a rate (steps per second) the steps are also held to rate*speed,
+    carrying over fractions of a step between frames; without one every
+    frame uses its whole budget and speed has no effect.  The clock is
+    checked every check_every steps, so one frame can go over budget by
+    that many steps.
+
+    steps_per_second is the measured rate, over windows of about half a
+    second.  Rates go by clock(), which a recording swaps for the time in
+    the recording; the budget is always real time.
+    When the iterator runs out done is set and result holds its return
+    value.
+    """
+
+    def __init__(self, budget=12, rate=0, speed=1.0, check_every=16,
+                 clock=time.perf_counter):
+
+        self.budget = budget / 1000
+        self.rate = rate
+        self.speed = speed
+        self.check_every = check_every
+        self.clock = clock
+
+        self.steps_per_second = 0.0
+        self.done = False
+        self.result = None
+
+        self._steps = None
+        self._allowance = 0.0
+        self._last_frame = None
+        self._counted = 0
+        self._count_start = None
+
+    @property
+    def target_rate(self):
+        """ Get the steps per second aimed for, 0 for as fast as possible. """
+
+        return self.rate*self.speed
+
+    def faster(self):
+        self.speed *= 2
+
+    def slower(self):
+        self.speed /= 2
+
+    def advance(self, steps):
+        """ Run steps from an iterator for one frame and get the values it
+        yielded.  A new iterator starts over with done cleared. """
+
+        now = self.clock()
+        if steps is not self._steps:
+            self._steps = steps
+            self.done = False
+            self.result = None
+            self._allowance = 0.0
+
+        # a long pause shouldn't turn into a burst of steps
+        elapsed = 0.0 if self._last_frame is None else now - self._last_frame
+        self._last_frame = now
+
+        limit = None
+        if self.rate:
+            target = self.target_rate
+            self._allowance = min(self._allowance + target*min(elapsed, 0.1),
+                                  target*0.1 + 1)
+            limit = int(self._allowance)
+            self._allowance -= limit
+
+        values = []
+        if not self.done and limit != 0:
+            deadline = time.perf_counter() + self.budget
+            check_every = self.check_every
+            try:
+                while True:
+                    values.append(next(steps))
+                    if len(values) == limit:
+                        break
+                    if (len(values) % check_every == 0
+                            and time.perf_counter() >= deadline):
+                        break
+            except StopIteration as finished:
+                self.done = True
+                self.result = finished.value
+
+        self._measure(len(values), now)
+        return values
+
+    def _measure(self, count, now):
+        """ Keep steps_per_second up to date. """
+
+        if self._count_start is None:
+            self._count_start = now
+        self._counted += count
+
+        seconds = now - self._count_start
+        if seconds > 0:
+            self.steps_per_second = self._counted / seconds
+        if seconds >= 0.5:
+            self._counted = 0
+            self._count_start = now
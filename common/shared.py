@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""Numpy arrays in shared memory
+
+Filename: shared.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+The process pools (the batch path finder, the tiled maze generator and the
+parallel sorts) hand their workers a numpy array in shared memory rather
+than pickling it over.  The parent makes a SharedArray, passes its spec to
+the pool initializer and frees it once the pool is done; each worker maps
+the same memory with attach().  Only numpy is needed, so the headless tools
+can use it without pygame.
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Shared memory attached in this process, kept so the buffers stay mapped
+_attached = []
+
+
+class SharedArray:
+    """ A new numpy array in shared memory, freed by close().
+
+    array is the whole array; views of it have to be dropped before
+    close().  spec is what attach() needs to map it in another process.
+    """
+
+    def __init__(self, shape, dtype):
+
+        self.shape = shape
+        self.dtype = np.dtype(dtype)
+
+        # a zero sized block can't be made
+        size = int(np.prod(shape))*self.dtype.itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        self.array = np.ndarray(shape, dtype=self.dtype, buffer=self._shm.buf)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def spec(self):
+        return (self._shm.name, self.shape, self.dtype.str)
+
+    def close(self):
+        """ Unmap and free the shared memory. """
+
+        self.array = None
+        self._shm.close()
+        self._shm.unlink()
+
+
+def attach(spec):
+    """ Map a SharedArray made in another process from its spec.  The
+    mapping lasts as long as the process. """
+
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    _attached.append(shm)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Bulk maze generation across a process pool
+
+Filename: bulk.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+Generates batches of mazes for testing solvers against.  Every maze gets
+its own seed, worked out from the base seed and the maze's number, so a
+batch comes out the same whatever the number of workers, and any one maze
+can be made again with Maze.generate and the seed stored in its header.
+Workers send back packed maze files (see mazefile.py) which are written in
+order, either to one archive or to shards of a fixed number of mazes.
+"""
+
+import io
+import numpy as np
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from generators import Maze
+from mazefile import write_maze
+
+
+def maze_seed(seed, number):
+    """ Get the seed for maze number in a batch made from seed. """
+
+    state = np.random.SeedSequence([seed, number]).generate_state(1, np.uint64)
+    return int(state[0] >> np.uint64(1))
+
+
+def _generate(job):
+    """ Generate one maze and pack it into the bytes of a maze file. """
+
+    width, height, algorithm, seed = job
+    maze = Maze.generate(width, height, algorithm, seed)
+
+    buffer = io.BytesIO()
+    write_maze(buffer, width, height, maze.cells, seed, algorithm)
+    return buffer.getvalue()
+
+
+def shard_path(path, shard):
+    """ Get the file name for a shard, e.g. mazes.maze -> mazes-00003.maze """
+
+    stem, extension = os.path.splitext(path)
+    return f"{stem}-{shard:05d}{extension}"
+
+
+def generate_mazes(count, width, height, algorithm="backtracker", seed=0,
+                   workers=None, output=None, shard_size=0, chunksize=4):
+    """ Generate count mazes across a process pool.
+
+    With an output path the mazes are written to it as one archive, or to
+    numbered shards of shard_size mazes each.  Returns the paths written.
+    """
+
+    jobs = [(width, height, algorithm, maze_seed(seed, number))
+            for number in range(count)]
+
+    paths = []
+    file = None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for number, data in enumerate(pool.map(_generate, jobs,
+                                                   chunksize=chunksize)):
+                if output is None:
+                    continue
+
+                # start a new file for every shard
+                if file is None or (shard_size and number % shard_size == 0):
+                    if file is not None:
+                        file.close()
+                    path = output
+                    if shard_size:
+                        path = shard_path(output, number // shard_size)
+                    file = open(path, "wb")
+                    paths.append(path)
+
+                file.write(data)
+    finally:
+        if file is not None:
+            file.close()
+
+    return paths
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Maze generation engine
+
+Filename: generators.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+Generates mazes without pygame.  A maze is a grid of cells where each cell
+records the passages to its east and south neighbors (the same thing the
+horz/vert flags on the old Square objects recorded).  The generators carve
+the maze in place and yield the cells each step changed, so the pygame
+script can animate them one step at a time while a headless caller just
+runs them to the end.
+
+The row algorithms (Eller, Sidewinder, Binary Tree) can also stream a maze a
+row at a time without holding the whole thing, which is how --output writes
+them; --height 0 streams forever.
+
+    python generators.py -W 2000 -H 2000 --seed 1
+    python generators.py -a eller -W 1000 -H 0 -o - | head -c 10000000 > part
+"""
+
+import click
+import collections
+import itertools
+import numpy as np
+import random
+import time
+
+# Passage bits for a cell
+EAST = 1
+SOUTH = 2
+
+
+class Maze:
+    """ Passage bits and visited flags for a width x height maze.
+
+    Both are kept in flat bytearrays padded with a one cell border (marked
+    visited, so the generators never step off the grid) with cell (x, y) at
+    index (y + 1)*stride + x + 1.  cells and visited_cells are (height,
+    width) numpy views onto the same memory without the border.
+    """
+
+    def __init__(self, width, height):
+
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+
+        size = (height + 2)*self.stride
+        self.walls = bytearray(size)
+        self.visited = bytearray(size)
+
+        padded = np.frombuffer(self.walls, dtype=np.uint8)
+        self.cells = padded.reshape(height + 2, self.stride)[1:-1, 1:-1]
+
+        padded = np.frombuffer(self.visited, dtype=np.uint8)
+        padded = padded.reshape(height + 2, self.stride)
+        padded[0, :] = padded[-1, :] = padded[:, 0] = padded[:, -1] = 1
+        self.visited_cells = padded[1:-1, 1:-1]
+
+    def index(self, x, y):
+        """ Get the flat index of a cell. """
+
+        return (y + 1)*self.stride + x + 1
+
+    def position(self, index):
+        """ Get the (x, y) position of a flat index. """
+
+        y, x = divmod(index, self.stride)
+        return (x - 1, y - 1)
+
+    def carve(self, cell, neighbor):
+        """ Open the wall between two neighboring cells (flat indices). """
+
+        if neighbor == cell + 1:
+            self.walls[cell] |= EAST
+        elif neighbor == cell - 1:
+            self.walls[neighbor] |= EAST
+        elif neighbor > cell:
+            self.walls[cell] |= SOUTH
+        else:
+            self.walls[neighbor] |= SOUTH
+
+    def is_complete(self):
+        """ Check that every cell has been visited. """
+
+        return bool(self.visited_cells.all())
+
+    @classmethod
+    def generate(cls, width, height, algorithm="backtracker", seed=None):
+        """ Generate a whole maze without drawing anything. """
+
+        maze = cls(width, height)
+        carver = ALGORITHMS[algorithm](maze, random.Random(seed))
+
+        # run the generator to the end without keeping anything
+        collections.deque(carver, maxlen=0)
+        return maze
+
+
+def backtracker(maze, rng=None, start=(0, 0)):
+    """ Carve a perfect maze with a randomized depth first search.
+
+    This is the same recursive backtracker the maze script always used, but
+    the visited cells are flags in a bytearray and the backtracking is an
+    explicit stack of flat indices, so each step is O(1).  A random ordering
+    of the four directions is picked per step and the first unvisited
+    neighbor in that order is taken, which picks uniformly among them with a
+    single random number.  Yields the (cell, neighbor) pair of flat indices
+    changed by every passage carved.
+    """
+
+    if rng is None:
+        rng = random.Random()
+    rand = rng.random
+
+    walls = maze.walls
+    visited = maze.visited
+    stride = maze.stride
+    orders = list(itertools.permutations((1, -1, stride, -stride)))
+    count = len(orders)
+
+    cell = maze.index(*start)
+    visited[cell] = 1
+    stack = [cell]
+
+    while stack:
+        cell = stack[-1]
+
+        # first unvisited neighbor (the border is always visited)
+        for step in orders[int(rand()*count)]:
+            neighbor = cell + step
+            if not visited[neighbor]:
+                break
+        else:
+            # Backup if there are no neighbors left for the cell
+            stack.pop()
+            continue
+
+        visited[neighbor] = 1
+
+        # set the direction of travel for the borders
+        if step == 1:
+            walls[cell] |= EAST
+        elif step == -1:
+            walls[neighbor] |= EAST
+        elif step > 0:
+            walls[cell] |= SOUTH
+        else:
+            walls[neighbor] |= SOUTH
+
+        stack.append(neighbor)
+        yield cell, neighbor
+
+
+def eller_rows(width, height=None, rng=None):
+    """ Stream a perfect maze one row at a time with Eller's algorithm.
+
+    Only the set labels for the current row are kept, so memory is
+    proportional to the width and height can be None for a maze that never
+    ends.  Each row is yielded as a uint8 array of passage bits once its
+    south passages are decided.
+
+    Each row randomly joins neighboring cells that are in different sets,
+    then every set carves at least one passage south; cells below a passage
+    stay in that set and the rest start new ones.  The last row joins every
+    remaining set.
+    """
+
+    if rng is None:
+        rng = random.Random()
+    rand = rng.random
+
+    sets = list(range(width))
+    next_set = width
+
+    y = 0
+    while height is None or y < height:
+        last = height is not None and y == height - 1
+        row = bytearray(width)
+
+        # union find over this row's labels
+        parent = {}
+
+        def find(label):
+            while parent.get(label, label) != label:
+                label = parent[label]
+            return label
+
+        # join neighbors that are not already connected
+        for x in range(width - 1):
+            a = find(sets[x])
+            b = find(sets[x + 1])
+            if a != b and (last or rand() < 0.5):
+                row[x] |= EAST
+                parent[b] = a
+
+        labels = [find(label) for label in sets]
+
+        if not last:
+            members = {}
+            for x, label in enumerate(labels):
+                members.setdefault(label, []).append(x)
+
+            # every set goes down at least once
+            sets = [-1]*width
+            for label, xs in members.items():
+                down = [x for x in xs if rand() < 0.5]
+                if not down:
+                    down = [xs[int(rand()*len(xs))]]
+                for x in down:
+                    row[x] |= SOUTH
+                    sets[x] = label
+
+            for x in range(width):
+                if sets[x] == -1:
+                    sets[x] = next_set
+                    next_set += 1
+
+        yield np.frombuffer(bytes(row), dtype=np.uint8)
+        y += 1
+
+
+def sidewinder_rows(width, height=None, rng=None):
+    """ Stream a perfect maze one row at a time with the Sidewinder
+    algorithm, using numpy on whole rows.
+
+    The first row is one long passage.  In each later row random east
+    passages split the row into runs, and each run carves north from one
+    random cell.  North passages are the previous row's south bits, so rows
+    come out one behind.
+    """
+
+    if rng is None:
+        rng = random.Random()
+    generator = np.random.default_rng(rng.getrandbits(64))
+
+    previous = np.full(width, EAST, dtype=np.uint8)
+    previous[-1] = 0
+
+    y = 1
+    while height is None or y < height:
+        east = generator.random(width) < 0.5
+        east[-1] = False
+        row = np.where(east, EAST, 0).astype(np.uint8)
+
+        # each run ends at a cell with no east passage
+        ends = np.flatnonzero(~east) + 1
+        starts = np.concatenate(([0], ends[:-1]))
+        picks = starts + (generator.random(len(starts))*(ends - starts)).astype(int)
+        previous[picks] |= SOUTH
+
+        yield previous
+        previous = row
+        y += 1
+
+    yield previous
+
+
+def binary_tree_rows(width, height=None, rng=None):
+    """ Stream a perfect maze one row at a time with the Binary Tree
+    algorithm, using numpy on whole rows.
+
+    Every cell carves either north or east.  The first row can only go east
+    and the last column can only go north.  Rows come out one behind, as
+    with sidewinder_rows.
+    """
+
+    if rng is None:
+        rng = random.Random()
+    generator = np.random.default_rng(rng.getrandbits(64))
+
+    previous = np.full(width, EAST, dtype=np.uint8)
+    previous[-1] = 0
+
+    y = 1
+    while height is None or y < height:
+        north = generator.random(width) < 0.5
+        north[-1] = True
+        row = np.where(north, 0, EAST).astype(np.uint8)
+        previous[north] |= SOUTH
+
+        yield previous
+        previous = row
+        y += 1
+
+    yield previous
+
+
+def _from_rows(rows):
+    """ Turn a row streaming generator into a carver like backtracker.
+
+    Each finished row is copied into the maze and marked visited, and the
+    flat indices of the row are yielded as the cells that changed.
+    """
+
+    def carver(maze, rng=None):
+        for y, row in enumerate(rows(maze.width, maze.height, rng)):
+            maze.cells[y] = row
+            maze.visited_cells[y] = 1
+
+            first = maze.index(0, y)
+            yield range(first, first + maze.width)
+
+    carver.__doc__ = rows.__doc__
+    return carver
+
+
+ROW_ALGORITHMS = {
+    "eller": eller_rows,
+    "sidewinder": sidewinder_rows,
+    "binary-tree": binary_tree_rows,
+}
+
+
+ALGORITHMS = {
+    "backtracker": backtracker,
+    "eller": _from_rows(eller_rows),
+    "sidewinder": _from_rows(sidewinder_rows),
+    "binary-tree": _from_rows(binary_tree_rows),
+}
+
+
+@click.command()
+@click.option("-W", "--width", type=int, default=2000, help="Maze width")
+@click.option("-H", "--height", type=int, default=2000,
+              help="Maze height (0 streams rows forever)")
+@click.option("-a", "--algorithm", type=click.Choice(sorted(ALGORITHMS)),
+              default="backtracker", help="Generation algorithm")
+@click.option("--seed", type=int, default=None, help="Random seed")
+@click.option("-o", "--output", type=click.File("wb"), default=None,
+              help="Write the passage bits, one byte per cell, row by row")
+def main(width, height, algorithm, seed, output):
+    """ Generate a maze headless and report how long it took. """
+
+    start_time = time.perf_counter()
+
+    if algorithm in ROW_ALGORITHMS:
+        rows = ROW_ALGORITHMS[algorithm](width, height or None,
+                                         random.Random(seed))
+        count = 0
+        for row in rows:
+            if output is not None:
+                output.write(row.tobytes())
+            count += 1
+        complete = True
+        height = count
+
+    else:
+        if height == 0:
+            raise click.BadParameter("only the row algorithms can stream",
+                                     param_hint="--height")
+        maze = Maze.generate(width, height, algorithm, seed)
+        if output is not None:
+            output.write(maze.cells.tobytes())
+        complete = maze.is_complete()
+
+    wall_time = time.perf_counter() - start_time
+    click.echo(f"{width}x{height} {algorithm} maze in {wall_time:.2f}s "
+               f"(complete: {complete})", err=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,27 @@ Last Updated: 2019-12-03
 
 import click
 import logging
+import os
 import structlog
 from structlog.stdlib import LoggerFactory
+# pygame says hello on stdout, which would end up in a --record - stream
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
 import pygame
 import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+from common.grid import grid_options
+from common.recorder import FrameRecorder, use_dummy_driver
+from common.scheduler import FrameScheduler
+
+from bulk import generate_mazes
+from generators import ALGORITHMS, EAST, SOUTH, Maze
+from mazefile import MazeFile, save
+from solver import METHODS, solve
+from tiled import generate_tiled
 # import pdb
 
 structlog.configure(logger_factory=LoggerFactory())
@@ -33,77 +50,58 @@ BLUE = (0, 0, 255)
 CYAN = (0, 255, 255)
 YELLOW = (255, 255, 0)
 
-WIDTH=600
-HEIGHT=600
-SQUARE_SIZE = 20
-MAX_X = int(WIDTH / SQUARE_SIZE) - 1
-MAX_Y = int(HEIGHT / SQUARE_SIZE) - 1
+def draw_square(gDisplay, geometry, maze, x, y, color):
+    """ Draw a cell, opening up the borders to the cells it has passages to. """
 
-class Square:
-    """ Store unit path information. """
+    bits = maze.cells[y, x]
 
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.pos = [x, y]
-        self.vert = False
-        self.horz = False
+    # Deal with the borders
+    x_step = 0 if bits & EAST else 2
+    y_step = 0 if bits & SOUTH else 2
 
+    size = geometry.square_size
+    rect = pygame.Rect(x*size + 2, y*size + 2, size - x_step, size - y_step)
+    pygame.draw.rect(gDisplay, color, rect)
 
-def idx_to_grid(n):
-    """ Convert between array and grid points. (Used in testing) """
-
-    x = n %  MAX_Y
-    y = int(n / MAX_X)
-    return(x, y)
-
-
-def get_neighbors(start_square, visited=[]):
-    """ Get the valid neighbors of a given square. """
-    neighbors = []
-
-    # loop over possible x values
-    for i in [start_square.x - 1, start_square.x, start_square.x + 1]:
-
-        # drop neighbors outside of our region of interest
-        if i < 0 or i > MAX_X:
-            continue
-
-        # loop over possible y values
-        for j in [start_square.y - 1, start_square.y, start_square.y + 1]:
-
-            # drop neighbors outside of our region of interest
-            if j < 0 or j > MAX_Y:
-                continue
-
-            # Ignore ourself
-            if i == start_square.x and j == start_square.y:
-                continue
-
-            # Ignore corner pieces
-            if  i == start_square.x - 1 and j !=  start_square.y:
-                continue
-            if  i == start_square.x + 1 and j !=  start_square.y:
-                continue
+    return rect
 
-            # Deal with barriers
-            found = False
-            for square in visited:
-                if square.pos == [i, j]:
-                    found = True
-                    break
-            if found:
-                continue
 
-            neighbors.append(Square(i, j))
+def idx_to_grid(geometry, n):
+    """ Convert between array and grid points. (Used in testing) """
 
-    return neighbors
+    x = n %  geometry.max_y
+    y = int(n / geometry.max_x)
+    return(x, y)
 
 
-@click.command()
+@click.group(invoke_without_command=True)
+@click.pass_context
 @click.option("-d", "--debug", "dbg", is_flag=True, default=False,
               help="Show debugging information")
-def main(dbg):
+@click.option("-a", "--algorithm", type=click.Choice(sorted(ALGORITHMS)),
+              default="backtracker", help="Generation algorithm")
+@click.option("--rate", type=float, default=30,
+              help="Generation steps per second (0 for as fast as possible)")
+@click.option("--speed", type=float, default=1.0,
+              help="Multiplier on --rate, also changed with up/down")
+@click.option("--budget", type=float, default=12,
+              help="Most milliseconds of generation per frame")
+@click.option("--seed", type=int, default=None, help="Random seed")
+@click.option("--save", "save_path", type=click.Path(dir_okay=False),
+              default=None, help="Save the finished maze to a maze file")
+@click.option("--load", "load_path", type=click.Path(exists=True,
+              dir_okay=False), default=None,
+              help="Show the top left corner of a maze file")
+@click.option("--solve", "method", type=click.Choice(METHODS), default=None,
+              help="Draw the path from start to end once the maze is done "
+                   "(tour is fastest; wavefront and dead-end take about 0.5-"
+                   "0.9s a million cells, more on bigger mazes)")
+@click.option("--record", "record_path", type=str, default=None,
+              help="Generate without a window, writing the frames to a PNG "
+                   "pattern/directory or raw RGB (.rgb or - for stdout)")
+@grid_options(600, 600, 20)
+def main(ctx, dbg, algorithm, rate, speed, budget, seed, save_path, load_path,
+         method, record_path, geometry):
     """ Main code block """
 
     if dbg is True:
@@ -111,137 +109,160 @@ def main(dbg):
     else:
         logging.basicConfig(level=logging.WARNING)
 
+    # Subcommands run without a window
+    if ctx.invoked_subcommand is not None:
+        return
+
     # Basic initialization
+    if record_path is not None:
+        use_dummy_driver()
     pygame.init()
     clock = pygame.time.Clock()
-    gDisplay = pygame.display.set_mode((WIDTH, HEIGHT))
+    gDisplay = pygame.display.set_mode(geometry.size)
+
+    # Recordings are drawn offscreen, as fast as they can be
+    recorder = None
+    if record_path is not None:
+        recorder = FrameRecorder(record_path, 30)
+        gDisplay = pygame.Surface(geometry.size)
+
+    if load_path is not None:
+        # Loaded mazes are already carved, so they get drawn in one step
+        maze = MazeFile(load_path).to_maze(0, 0, geometry.columns,
+                                           geometry.rows)
+        carver = iter([[maze.index(x, y) for y in range(maze.height)
+                                         for x in range(maze.width)]])
+    else:
+        # The maze engine does the carving
+        maze = Maze(geometry.columns, geometry.rows)
+        carver = ALGORITHMS[algorithm](maze, random.Random(seed))
 
     # Start and end points
-    start_square = Square(0, 0)
-    end_square = Square(MAX_X, MAX_Y)
-
-    # Keep track of everything
-    visited = [start_square]
-    path = [start_square]
-    total_squares = (MAX_X + 1) * (MAX_Y + 1)
+    start_square = (0, 0)
+    end_square = (maze.width - 1, maze.height - 1)
+    colors = {start_square: GREEN, end_square: RED}
+
+    # The grid only gets drawn once, after that we only paint over the
+    # squares that the carver changed
+    gDisplay.blit(geometry.lines(WHITE, BLACK, 2, edges=True), (0, 0))
+    for square, color in colors.items():
+        draw_square(gDisplay, geometry, maze, *square, color)
+    pygame.display.update()
+
+    # The scheduler decides how much carving fits in each frame
+    # (recordings go by the time in the recording)
+    now = time.perf_counter if recorder is None else recorder.time
+    scheduler = FrameScheduler(budget, rate, speed, clock=now)
 
     # The game loop
     running = True
+    generating = True
     while running:
 
         # Check for interactions
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-
-        # Set the initial background
-        gDisplay.fill(WHITE)
-
-        # Draw the grid
-        for i in range(0, int(WIDTH/SQUARE_SIZE)):
-            x = SQUARE_SIZE*i
-            pygame.draw.line(gDisplay, BLACK, (x, 0), (x, HEIGHT), 2)
-
-        for i in range(0, int(HEIGHT/SQUARE_SIZE)):
-            y = SQUARE_SIZE*i
-            pygame.draw.line(gDisplay, BLACK, (0, y), (WIDTH, y), 2)
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_UP:
+                    scheduler.faster()
+                elif event.key == pygame.K_DOWN:
+                    scheduler.slower()
 
         # continue running until we've been to every square
-        if len(visited) < total_squares:
-
-            # loop until we've successfully added a new square to the path
-            while True:
-
-                # get the last square visited and it's neighbor
-                last = path.pop()
-                neighbors = get_neighbors(last, visited)
-
-                # Backup if there are no neighbors left for the square
-                if len(neighbors) == 0:
-                    continue
-
-                # Pick a neighbor square at random
-                random.shuffle(neighbors)
-                neighbor = neighbors.pop()
-
-                # set the direction of travel for the borders
-                if neighbor.x == last.x:
-                    if neighbor.y == last.y + 1:
-                        last.vert = True
-                    if neighbor.y == last.y - 1:
-                        neighbor.vert = True
-
-                if neighbor.y == last.y:
-                    if neighbor.x == last.x + 1:
-                        last.horz = True
-                    if neighbor.x == last.x - 1:
-                        neighbor.horz = True
-
-                # add the last visited back to the path along with the new
-                # square
-                path.append(last)
-                path.append(neighbor)
-
-                # mark the new square as now visited
-                visited.append(neighbor)
-
-                break
-
-        # Draw all of the visited squares
-        for square in visited:
-
-            x = square.x*SQUARE_SIZE + 2
-            y = square.y*SQUARE_SIZE + 2
-
-            # Deal with the borders
-            x_step = 2
-            y_step = 2
-
-            if square.vert is True:
-                y_step = 0
-
-            if square.horz is True:
-                x_step = 0
-
-            pygame.draw.rect(gDisplay, CYAN,
-                    pygame.Rect(x, y,
-                        SQUARE_SIZE - x_step,
-                        SQUARE_SIZE - y_step))
-
-        # Draw the start square green
-        x = start_square.x*SQUARE_SIZE + 2
-        y = start_square.y*SQUARE_SIZE + 2
-
-        # Deal with the borders
-        x_step = 2
-        y_step = 2
-
-        if start_square.vert is True:
-            y_step = 0
-        if start_square.horz is True:
-            x_step = 0
-
-        pygame.draw.rect(gDisplay, GREEN,
-                pygame.Rect(x, y, SQUARE_SIZE - x_step, SQUARE_SIZE - y_step))
-
-        # Draw the finish red
-        x = end_square.x*SQUARE_SIZE + 2
-        y = end_square.y*SQUARE_SIZE + 2
-
-        # Deal with the borders
-        x_step = 2
-        y_step = 2
-
-        if end_square.vert is True:
-            y_step = 0
-        if end_square.horz is True:
-            x_step = 0
-
-        pygame.draw.rect(gDisplay, RED,
-                pygame.Rect(x, y, SQUARE_SIZE - x_step, SQUARE_SIZE - y_step))
-
-        pygame.display.update()
-        clock.tick(30)
+        changed = set()
+        if generating is True:
+            for cells in scheduler.advance(carver):
+                changed.update(cells)
+
+            if scheduler.done:
+                generating = False
+                if save_path is not None and load_path is None:
+                    save(save_path, maze, seed, algorithm)
+                    info("Saved maze", path=save_path)
+
+                if method is not None:
+                    path = solve(maze, start_square, end_square, method)
+                    debug("Solved maze", method=method, length=len(path))
+                    for square in path:
+                        colors.setdefault(square, YELLOW)
+                        changed.add(maze.index(*square))
+
+            pygame.display.set_caption(
+                f"Maze {scheduler.steps_per_second:.0f} steps/s")
+
+        # Paint the changed squares
+        rects = []
+        for cell in changed:
+            square = maze.position(cell)
+            rects.append(draw_square(gDisplay, geometry, maze, *square,
+                                     colors.get(square, CYAN)))
+
+        if recorder is not None:
+            # a recording stops with the finished maze
+            recorder.add(gDisplay)
+            running = generating
+        else:
+            if rects:
+                pygame.display.update(rects)
+            clock.tick(30)
+
+    if recorder is not None:
+        recorder.close()
+        info("Recorded frames", frames=recorder.frames, path=record_path)
+
+
+@main.command()
+@click.option("-n", "--count", type=int, default=100,
+              help="Number of mazes")
+@click.option("-W", "--width", type=int, default=100, help="Maze width")
+@click.option("-H", "--height", type=int, default=100, help="Maze height")
+@click.option("-a", "--algorithm", type=click.Choice(sorted(ALGORITHMS)),
+              default="backtracker", help="Generation algorithm")
+@click.option("--seed", type=int, default=0, help="Base random seed")
+@click.option("-w", "--workers", type=int, default=os.cpu_count(),
+              help="Number of worker processes")
+@click.option("-o", "--output", type=click.Path(dir_okay=False),
+              default=None, help="Archive to write the mazes to")
+@click.option("--shard-size", type=int, default=0,
+              help="Mazes per file, numbered after --output (0 for one file)")
+def bulk(count, width, height, algorithm, seed, workers, output, shard_size):
+    """ Generate a reproducible batch of mazes across a process pool. """
+
+    start_time = time.perf_counter()
+    paths = generate_mazes(count, width, height, algorithm, seed, workers,
+                           output, shard_size)
+    wall_time = time.perf_counter() - start_time
+
+    click.echo(f"{count} {width}x{height} {algorithm} mazes on {workers} "
+               f"workers in {wall_time:.2f}s: {count / wall_time:.1f} "
+               f"mazes/s ({len(paths)} files)", err=True)
+
+
+@main.command()
+@click.option("-W", "--width", type=int, default=8000, help="Maze width")
+@click.option("-H", "--height", type=int, default=8000, help="Maze height")
+@click.option("-t", "--tile-size", type=int, default=512,
+              help="Width and height of a tile")
+@click.option("-a", "--algorithm", type=click.Choice(sorted(ALGORITHMS)),
+              default="backtracker", help="Generation algorithm")
+@click.option("--seed", type=int, default=0, help="Random seed")
+@click.option("-w", "--workers", type=int, default=os.cpu_count(),
+              help="Number of worker processes")
+@click.option("-o", "--output", type=click.Path(dir_okay=False),
+              default=None, help="Maze file to save the maze to")
+def tiled(width, height, tile_size, algorithm, seed, workers, output):
+    """ Generate one huge maze in tiles across a process pool. """
+
+    start_time = time.perf_counter()
+    maze = generate_tiled(width, height, tile_size, algorithm, seed, workers)
+    wall_time = time.perf_counter() - start_time
+
+    click.echo(f"{width}x{height} {algorithm} maze in {tile_size} tiles on "
+               f"{workers} workers in {wall_time:.2f}s", err=True)
+
+    if output is not None:
+        save(output, maze, seed, algorithm, tile_size)
 
 
 if __name__ == "__main__":
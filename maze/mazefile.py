@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Packed maze files
+
+Filename: mazefile.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+A maze file is a 64 byte header followed by the passage bits of every cell
+packed two bits to a cell (EAST in the low bit, SOUTH in the high bit), four
+cells to a byte.  Each row is padded out to a whole number of bytes so a row
+starts on a byte boundary, which lets a region of the maze be read straight
+out of a numpy.memmap without touching the rest of the file.
+
+Header layout (little endian):
+
+    magic       4s   b"MAZE"
+    version     B    1
+    bits        B    bits per cell (2)
+    flags       H    bit 0 set when a seed is stored, bit 1 when the maze
+                     was generated in tiles
+    width       I
+    height      I
+    seed        q
+    algorithm   16s  ascii, nul padded
+    tile_size   I    for tiled mazes
+    reserved    20x
+
+Maze.generate(width, height, algorithm, seed) makes a maze with a seed again,
+unless it was generated in tiles; those need tiled.generate_tiled with the
+tile size as well.
+
+An archive is just maze files written one after the other.
+"""
+
+import numpy as np
+import os
+import struct
+
+from generators import EAST, SOUTH, Maze
+
+MAGIC = b"MAZE"
+VERSION = 1
+BITS = 2
+CELLS_PER_BYTE = 8 // BITS
+
+HEADER = struct.Struct("<4sBBHIIq16sI20x")
+HAS_SEED = 1
+TILED = 2
+
+_SHIFTS = np.arange(0, 8, BITS, dtype=np.uint8)
+
+
+def row_bytes(width):
+    """ Get the number of bytes a packed row of width cells takes. """
+
+    return -(-width // CELLS_PER_BYTE)
+
+
+def pack_row(row):
+    """ Pack a row of passage bits into bytes, four cells to a byte. """
+
+    padded = np.zeros(row_bytes(len(row))*CELLS_PER_BYTE, dtype=np.uint8)
+    padded[:len(row)] = row
+    padded = padded.reshape(-1, CELLS_PER_BYTE) << _SHIFTS
+    return np.bitwise_or.reduce(padded, axis=1).astype(np.uint8)
+
+
+def unpack(packed, width):
+    """ Unpack (rows, bytes) packed passage bits into (rows, width) cells. """
+
+    cells = (packed[..., None] >> _SHIFTS) & 3
+    rows, size = packed.shape
+    return cells.reshape(rows, size*CELLS_PER_BYTE)[:, :width]
+
+
+def write_maze(file, width, height, rows, seed=None, algorithm="",
+               tile_size=None):
+    """ Write a maze to an open binary file from an iterable of rows.
+
+    Rows are packed as they come, so the row streaming generators can be
+    written without holding the whole maze.  tile_size is set for mazes
+    made by generate_tiled.
+    """
+
+    flags = HAS_SEED if seed is not None else 0
+    if tile_size is not None:
+        flags |= TILED
+    file.write(HEADER.pack(MAGIC, VERSION, BITS, flags, width, height,
+                           seed or 0, algorithm.encode("ascii"),
+                           tile_size or 0))
+
+    for row in rows:
+        file.write(pack_row(row).tobytes())
+
+
+def save(path, maze, seed=None, algorithm="", tile_size=None):
+    """ Save a Maze to path. """
+
+    with open(path, "wb") as file:
+        write_maze(file, maze.width, maze.height, maze.cells, seed, algorithm,
+                   tile_size)
+
+
+def read_archive(path):
+    """ Open every maze in an archive of maze files written back to back. """
+
+    mazes = []
+    offset = 0
+    end = os.path.getsize(path)
+    while offset < end:
+        mazes.append(MazeFile(path, offset))
+        offset += mazes[-1].size
+
+    return mazes
+
+
+class MazeFile:
+    """ A maze file opened through numpy.memmap.
+
+    Opening only reads the header; region() unpacks just the bytes that
+    cover the cells asked for.  offset is where the maze starts in the file
+    and size is how many bytes it takes, header included.
+    """
+
+    def __init__(self, path, offset=0):
+
+        with open(path, "rb") as file:
+            file.seek(offset)
+            header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path} is too short to be a maze file")
+
+        (magic, version, bits, flags, self.width, self.height, seed,
+         algorithm, tile_size) = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a maze file")
+        if version != VERSION or bits != BITS:
+            raise ValueError(f"{path} has an unsupported version or cell size")
+
+        self.seed = seed if flags & HAS_SEED else None
+        self.tile_size = tile_size if flags & TILED else None
+        self.algorithm = algorithm.rstrip(b"\0").decode("ascii")
+
+        shape = (self.height, row_bytes(self.width))
+        if self.width and self.height:
+            self.packed = np.memmap(path, dtype=np.uint8, mode="r",
+                                    offset=offset + HEADER.size, shape=shape)
+        else:
+            self.packed = np.zeros(shape, dtype=np.uint8)
+
+        self.size = HEADER.size + self.packed.nbytes
+
+    def region(self, x, y, width, height):
+        """ Get the passage bits for a region as a (height, width) array.
+
+        The region is clipped to the maze.  Passages leading out of the
+        region are left as they are.
+        """
+
+        x_end = min(x + width, self.width)
+        y_end = min(y + height, self.height)
+
+        first = x // CELLS_PER_BYTE
+        last = row_bytes(x_end)
+        cells = unpack(self.packed[y:y_end, first:last], last*CELLS_PER_BYTE)
+
+        offset = x - first*CELLS_PER_BYTE
+        return cells[:, offset:offset + x_end - x]
+
+    def to_maze(self, x=0, y=0, width=None, height=None):
+        """ Load a region (by default everything) into a Maze.
+
+        Passages leading out of the region are closed off, so a region of a
+        perfect maze is still a maze, if not a perfect one.
+        """
+
+        if width is None:
+            width = self.width - x
+        if height is None:
+            height = self.height - y
+
+        cells = self.region(x, y, width, height)
+        maze = Maze(cells.shape[1], cells.shape[0])
+        maze.cells[:] = cells
+        if maze.width:
+            maze.cells[:, -1] &= ~np.uint8(EAST)
+        if maze.height:
+            maze.cells[-1, :] &= ~np.uint8(SOUTH)
+        maze.visited_cells[:] = 1
+
+        return maze
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Maze solvers
+
+Filename: solver.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+Solves a Maze straight from its passage bits with numpy, working on the
+same padded flat indices as the generators.  The solvers work on whole
+arrays of cells per step rather than one cell at a time; only walking the
+final path back is done cell by cell.
+
+wavefront
+    Breadth first search from the start.  Corridors (cells with exactly two
+    passages) are first followed to the junctions at either end by pointer
+    jumping, and the wavefront then only expands junctions, taking a whole
+    corridor per step.  Gives the distance to every reachable cell.
+
+dead-end
+    Dead end filling: every cell with a single passage (other than the start
+    and end) is filled in, which can turn its neighbor into a dead end, until
+    none are left.  Over the same corridors as wavefront, so each round
+    fills whole corridors.  In a perfect maze only the path is left over.
+
+tour
+    Both of those still take a numpy step per junction along the deepest
+    branch, thousands of them for the backtracker.  For mazes without loops
+    (everything the generators make) the distances can be read off an Euler
+    tour of the passages instead, in a fixed number of whole array steps.
+
+Measured on one core: a 1000x1000 maze takes about 0.3s with tour and
+0.5-0.9s with wavefront or dead-end, and a 2000x2000 one about 1.6s with
+tour and 2.5-3.5s with the others (the backtracker's mazes are the slow
+end).
+
+    python solver.py -W 2000 -H 2000 --seed 1 -m dead-end
+"""
+
+import click
+import numpy as np
+import time
+
+from generators import ALGORITHMS, EAST, SOUTH, Maze
+from mazefile import MazeFile
+
+# Distance for cells the wavefront never reaches
+UNREACHABLE = -1
+
+
+def _moves(maze):
+    """ Get the open directions of every padded flat cell and their deltas.
+
+    Bit k of moves[i] is set when there is a passage from i to i + deltas[k].
+    """
+
+    walls = np.frombuffer(maze.walls, dtype=np.uint8)
+    east = walls & EAST
+    south = (walls & SOUTH) >> 1
+
+    moves = east | south << 1
+    moves[1:] |= east[:-1] << 2
+    moves[maze.stride:] |= south[:-maze.stride] << 3
+
+    deltas = np.array([1, maze.stride, -1, -maze.stride])
+    return moves, deltas
+
+
+# NEXT_MOVE[moves, k] is the first open direction after k, going round
+NEXT_MOVE = np.array([[next(((k + j) % 4 for j in range(1, 5)
+                             if mask >> (k + j) % 4 & 1), 0)
+                       for k in range(4)] for mask in range(16)])
+
+# Number of open directions in each moves mask
+PASSAGES = np.array([bin(mask).count("1") for mask in range(16)])
+
+
+def _shift(values, delta, fill):
+    """ Get values[i + delta] for every i, with fill past either end. """
+
+    shifted = np.full_like(values, fill)
+    if delta > 0:
+        shifted[:-delta] = values[delta:]
+    else:
+        shifted[-delta:] = values[:delta]
+    return shifted
+
+
+def _corridors(maze, ends=()):
+    """ Follow every passage along its corridor to the next junction.
+
+    Corridor cells have exactly two passages; every other open cell, and
+    the cells in ends, is a junction.  Each arc (a passage, one way) points
+    at the arc that carries on out of the corridor cell it leads into, and
+    pointer jumping, where every arc skips ahead to where the arc it points
+    at points, finds the arc into the next junction for all of them in about
+    log2(cells) whole array steps however long the corridors are.
+
+    Returns moves, the corridor cells and two (4, cells) arrays: far[k, i]
+    is the junction at the end of the corridor leaving i in direction k (-1
+    where there is no passage) and length[k, i] how many steps away it is.
+    Arcs on a loop of corridor cells never reach a junction and end up at
+    a corridor cell instead.
+    """
+
+    moves, deltas = _moves(maze)
+    size = len(moves)
+    corridor = PASSAGES[moves] == 2
+    corridor[[maze.index(*square) for square in ends]] = False
+
+    # arc k*size + i leaves i in direction k; an arc into a corridor cell
+    # goes on out of its other passage
+    cells = np.arange(size, dtype=np.int32)
+    last = np.empty((4, size), dtype=np.int32)
+    through = np.empty((4, size), dtype=bool)
+    for k, delta in enumerate(deltas.tolist()):
+        onward = NEXT_MOVE[_shift(moves, delta, 0), k ^ 2]
+        through[k] = ((moves >> k) & 1 == 1) & _shift(corridor, delta, False)
+        last[k] = np.where(through[k], onward*size + cells + delta,
+                           k*size + cells)
+    last = last.ravel()
+    through = through.ravel()
+    steps = through.astype(np.int32)
+
+    active = np.flatnonzero(through)
+    for _ in range(len(last).bit_length()):
+        if not active.size:
+            break
+        ahead = last[active]
+        steps[active] += steps[ahead]
+        last[active] = last[ahead]
+        active = active[through[last[active]]]
+
+    direction, cell = np.divmod(last, size)
+    far = (cell + deltas[direction]).astype(np.int32).reshape(4, size)
+    far[(moves >> np.arange(4)[:, None]) & 1 == 0] = -1
+    return moves, corridor, far, steps.reshape(4, size) + 1
+
+
+def _corridor_ends(moves, corridor):
+    """ Get the corridor cells and the directions out of either end. """
+
+    cells = np.flatnonzero(corridor)
+    first = NEXT_MOVE[moves[cells], 3]
+    return cells, first, NEXT_MOVE[moves[cells], first]
+
+
+def distance_field(maze, start=(0, 0)):
+    """ Get the distance from start to every cell as a (height, width) array.
+
+    Cells that cannot be reached are UNREACHABLE.  The wavefront runs over
+    the junctions, with every corridor a single step as long as the
+    corridor, so it takes a numpy step per junction on the way rather than
+    per cell.  Corridor cells then get the distance through the nearer of
+    their two ends.
+    """
+
+    moves, corridor, far, length = _corridors(maze, [start])
+
+    unreached = np.iinfo(np.int64).max // 2
+    dist = np.full(len(moves), unreached, dtype=np.int64)
+    frontier = np.array([maze.index(*start)])
+    dist[frontier] = 0
+
+    while frontier.size:
+        to = far[:, frontier]
+        reach = dist[frontier] + length[:, frontier]
+
+        closer = (to != -1) & (reach < dist[to])
+        to, reach = to[closer], reach[closer]
+        np.minimum.at(dist, to, reach)
+        frontier = np.unique(to)
+
+    cells, first, second = _corridor_ends(moves, corridor)
+    dist[cells] = np.minimum(
+        dist[far[first, cells]] + length[first, cells],
+        dist[far[second, cells]] + length[second, cells])
+
+    dist[dist >= unreached] = UNREACHABLE
+    dist = dist.astype(np.int32)
+    return dist.reshape(maze.height + 2, maze.stride)[1:-1, 1:-1]
+
+
+def dead_end_fill(maze, keep=()):
+    """ Fill in dead ends until none are left.
+
+    Returns a (height, width) boolean array of the cells still open.  The
+    cells in keep (e.g. the start and end) are never filled.  Only the
+    junctions are filled a round at a time: filling one fills the corridors
+    out of it with it, which takes a passage away from the junction at the
+    far end of each, so the rounds go by junctions rather than cells.  A
+    corridor is filled in the end when either of its ends was.
+    """
+
+    moves, corridor, far, length = _corridors(maze, keep)
+    degree = PASSAGES[moves]
+
+    filled = np.zeros(len(moves), dtype=bool)
+    filled[:] = np.frombuffer(maze.visited, dtype=np.uint8) == 0
+    filled.reshape(maze.height + 2, maze.stride)[[0, -1], :] = True
+    filled.reshape(maze.height + 2, maze.stride)[:, [0, -1]] = True
+
+    kept = np.zeros(len(moves), dtype=bool)
+    kept[[maze.index(*square) for square in keep]] = True
+
+    frontier = np.flatnonzero((degree <= 1) & ~filled & ~kept & ~corridor)
+    while frontier.size:
+        filled[frontier] = True
+
+        # junctions at the far end lose a passage, some become dead ends
+        neighbors = far[:, frontier]
+        neighbors = neighbors[neighbors != -1]
+        neighbors = neighbors[~filled[neighbors]]
+        np.subtract.at(degree, neighbors, 1)
+
+        neighbors = np.unique(neighbors)
+        frontier = neighbors[(degree[neighbors] <= 1) & ~kept[neighbors]]
+
+    # corridors in a loop of their own never reach a filled junction
+    cells, first, second = _corridor_ends(moves, corridor)
+    filled[cells] = filled[far[first, cells]] | filled[far[second, cells]]
+
+    return ~filled.reshape(maze.height + 2, maze.stride)[1:-1, 1:-1]
+
+
+# On average one arc in SPLIT_EVERY starts a walk when ranking the tour
+SPLIT_EVERY = 64
+
+
+def _tour(maze, start):
+    """ Get the Euler tour of the passages reachable from start.
+
+    Every passage is a pair of arcs, one each way, numbered in flat cell
+    order.  Following the passages round each cell in turn visits every
+    arc reachable from start exactly once before coming back, as long as
+    the maze has no loops.  Returns the head cell of each arc, the reverse
+    of each arc and each arc's position in the tour from start (-1 for
+    arcs the tour never reaches).
+
+    The positions come from walking every arc's successor at once from a
+    random set of splitter arcs until each walk reaches the next splitter,
+    then adding up the walk lengths along the splitters in Python, so the
+    numpy work is proportional to the number of arcs.
+    """
+
+    moves, deltas = _moves(maze)
+    arcs = np.flatnonzero(((moves[:, None] >> np.arange(4)) & 1).ravel())
+
+    number = np.full(len(moves)*4, -1, dtype=np.int64)
+    number[arcs] = np.arange(len(arcs))
+
+    tail, direction = arcs >> 2, arcs & 3
+    head = tail + deltas[direction]
+    reverse = number[head*4 + (direction ^ 2)]
+    succ = number[head*4 + NEXT_MOVE[moves[head], direction ^ 2]]
+
+    position = np.full(len(arcs), -1, dtype=np.int64)
+    root = maze.index(*start)
+    if moves[root] == 0:
+        return head, reverse, position
+
+    # the tour starts with the first arc out of start
+    first = number[root*4 + NEXT_MOVE[moves[root], 3]]
+
+    rng = np.random.default_rng(0)
+    is_splitter = rng.random(len(arcs)) < 1/SPLIT_EVERY
+    is_splitter[first] = True
+    splitters = np.flatnonzero(is_splitter)
+
+    splitter_number = np.full(len(arcs), -1, dtype=np.int64)
+    splitter_number[splitters] = np.arange(len(splitters))
+    owner = splitter_number.copy()
+    offset = np.zeros(len(arcs), dtype=np.int64)
+
+    # walk from every splitter to the next one
+    following = np.empty(len(splitters), dtype=np.int64)
+    gap = np.empty(len(splitters), dtype=np.int64)
+    walkers = np.arange(len(splitters))
+    current = succ[splitters]
+    step = 1
+    while walkers.size:
+        arrived = is_splitter[current]
+        following[walkers[arrived]] = splitter_number[current[arrived]]
+        gap[walkers[arrived]] = step
+
+        walkers = walkers[~arrived]
+        current = current[~arrived]
+        owner[current] = walkers
+        offset[current] = step
+
+        current = succ[current]
+        step += 1
+
+    # lay the splitters out along the tour
+    splitter_position = np.full(len(splitters), -1, dtype=np.int64)
+    following = following.tolist()
+    gap = gap.tolist()
+    here = splitter_number[first]
+    distance = 0
+    while splitter_position[here] == -1:
+        splitter_position[here] = distance
+        distance += gap[here]
+        here = following[here]
+
+    reached = owner != -1
+    reached[reached] = splitter_position[owner[reached]] != -1
+    position[reached] = splitter_position[owner[reached]] + offset[reached]
+
+    return head, reverse, position
+
+
+def tree_distances(maze, start=(0, 0)):
+    """ Get the distance from start to every cell, like distance_field, for
+    mazes without loops (everything the generators make).
+
+    Along the Euler tour an arc leading away from start adds one to the
+    depth and its reverse takes it off again, so a running sum of the arcs
+    in tour order gives the depth of every cell at once.
+    """
+
+    head, reverse, position = _tour(maze, start)
+    dist = np.full((maze.height + 2)*maze.stride, UNREACHABLE, dtype=np.int32)
+    dist[maze.index(*start)] = 0
+
+    reached = np.flatnonzero(position != -1)
+    order = np.empty(len(reached), dtype=np.int64)
+    order[position[reached]] = reached
+
+    down = position[order] < position[reverse[order]]
+    depth = np.cumsum(np.where(down, 1, -1))
+    dist[head[order[down]]] = depth[down]
+
+    return dist.reshape(maze.height + 2, maze.stride)[1:-1, 1:-1]
+
+
+def tree_path(maze, start=(0, 0), end=None):
+    """ Get the path from start to end, like solve, for mazes without loops.
+
+    A cell is on the path when the tour goes down into it before it goes
+    down into end and comes back up out of it afterwards, so the path is
+    picked out of the tour with whole array comparisons.
+    """
+
+    if end is None:
+        end = (maze.width - 1, maze.height - 1)
+    if tuple(start) == tuple(end):
+        return [tuple(start)]
+
+    head, reverse, position = _tour(maze, start)
+    down = (position != -1) & (position < position[reverse])
+
+    into_end = np.flatnonzero(down & (head == maze.index(*end)))
+    if not into_end.size:
+        return []
+    last = position[into_end[0]]
+
+    arcs = np.flatnonzero(down & (position <= last) & (position[reverse] > last))
+    arcs = arcs[np.argsort(position[arcs])]
+
+    return [tuple(start)] + [maze.position(cell) for cell in head[arcs].tolist()]
+
+
+def trace_path(maze, dist, end):
+    """ Walk the distance field back from end to get the path to the start.
+
+    Returns the (x, y) cells from the start to end, or [] if end cannot be
+    reached.  Each step follows a passage to a cell one closer to the start.
+    """
+
+    x, y = end
+    if dist[y, x] == UNREACHABLE:
+        return []
+
+    cells = maze.cells
+    path = [(x, y)]
+    for d in range(int(dist[y, x]) - 1, -1, -1):
+        if cells[y, x] & EAST and dist[y, x + 1] == d:
+            x += 1
+        elif cells[y, x] & SOUTH and dist[y + 1, x] == d:
+            y += 1
+        elif x > 0 and cells[y, x - 1] & EAST and dist[y, x - 1] == d:
+            x -= 1
+        else:
+            y -= 1
+        path.append((x, y))
+
+    path.reverse()
+    return path
+
+
+def solve(maze, start=(0, 0), end=None, method="tour"):
+    """ Get the path from start to end as a list of (x, y) cells.
+
+    The default end is the bottom right cell.  dead-end fills the dead ends
+    first and then only looks at what is left.
+    """
+
+    if end is None:
+        end = (maze.width - 1, maze.height - 1)
+
+    if method == "wavefront":
+        return trace_path(maze, distance_field(maze, start), end)
+
+    if method == "dead-end":
+        remaining = dead_end_fill(maze, keep=(start, end))
+
+        # only the cells left open can be on the path
+        trimmed = Maze(maze.width, maze.height)
+        trimmed.cells[:] = maze.cells
+        east = remaining[:, :-1] & remaining[:, 1:]
+        south = remaining[:-1, :] & remaining[1:, :]
+        trimmed.cells[:, :-1][~east] &= ~np.uint8(EAST)
+        trimmed.cells[:-1, :][~south] &= ~np.uint8(SOUTH)
+        trimmed.visited_cells[:] = remaining
+        maze = trimmed
+
+    return tree_path(maze, start, end)
+
+
+METHODS = ("tour", "wavefront", "dead-end")
+
+
+@click.command()
+@click.option("-W", "--width", type=int, default=2000, help="Maze width")
+@click.option("-H", "--height", type=int, default=2000, help="Maze height")
+@click.option("-a", "--algorithm", type=click.Choice(sorted(ALGORITHMS)),
+              default="backtracker", help="Generation algorithm")
+@click.option("--seed", type=int, default=None, help="Random seed")
+@click.option("--load", "load_path", type=click.Path(exists=True,
+              dir_okay=False), default=None,
+              help="Solve a maze file instead of generating one")
+@click.option("-m", "--method", type=click.Choice(METHODS),
+              default="tour", help="Solver (tour is the fastest, about 0.3s "
+                                   "for 1000x1000 and 1.6s for 2000x2000)")
+def main(width, height, algorithm, seed, load_path, method):
+    """ Solve a maze headless and report how long it took. """
+
+    if load_path is not None:
+        maze = MazeFile(load_path).to_maze()
+    else:
+        maze = Maze.generate(width, height, algorithm, seed)
+
+    start_time = time.perf_counter()
+    path = solve(maze, method=method)
+    wall_time = time.perf_counter() - start_time
+
+    click.echo(f"{maze.width}x{maze.height} maze solved with {method} in "
+               f"{wall_time:.2f}s (path length {len(path)})", err=True)
+
+
+if __name__ == "__main__":
+    main()
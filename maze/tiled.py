@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tiled maze generation across a process pool
+
+Filename: tiled.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+Splits a huge maze into tiles and has worker processes generate a perfect
+maze in each tile straight into a passage bit array in shared memory.  The
+tiles are then joined along a random spanning tree of the tile grid, with
+exactly one passage opened across each tree edge.  Each tile is a tree of
+cells and the tiles are joined as a tree, so the whole maze is still
+perfect.
+"""
+
+import numpy as np
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from common.shared import SharedArray, attach
+
+from bulk import maze_seed
+from generators import EAST, SOUTH, Maze
+
+# The passage bits a worker process generates its tiles into
+_worker = {}
+
+
+def _init_worker(cells):
+    """ Map the shared passage bits into the worker. """
+
+    _worker["cells"] = attach(cells)
+
+
+def _generate_tile(job):
+    """ Generate one tile's maze into the shared passage bits. """
+
+    x, y, width, height, algorithm, seed = job
+    maze = Maze.generate(width, height, algorithm, seed)
+    _worker["cells"][y:y + height, x:x + width] = maze.cells
+
+
+def tiles(width, height, tile_size):
+    """ Get the (x, y, width, height) of every tile, row by row. """
+
+    return [(x, y, min(tile_size, width - x), min(tile_size, height - y))
+            for y in range(0, height, tile_size)
+            for x in range(0, width, tile_size)]
+
+
+def stitch(cells, tile_size, rng):
+    """ Open one passage across every edge of a random spanning tree of
+    the tiles, picked with randomized Kruskal's algorithm. """
+
+    height, width = cells.shape
+    columns = -(-width // tile_size)
+    rows = -(-height // tile_size)
+
+    edges = [(tx, ty, EAST) for ty in range(rows) for tx in range(columns - 1)]
+    edges += [(tx, ty, SOUTH) for ty in range(rows - 1) for tx in range(columns)]
+    rng.shuffle(edges)
+
+    parent = list(range(columns*rows))
+
+    def find(tile):
+        while parent[tile] != tile:
+            parent[tile] = parent[parent[tile]]
+            tile = parent[tile]
+        return tile
+
+    for tx, ty, direction in edges:
+        a = find(ty*columns + tx)
+        if direction == EAST:
+            b = find(ty*columns + tx + 1)
+        else:
+            b = find((ty + 1)*columns + tx)
+        if a == b:
+            continue
+        parent[b] = a
+
+        # a random cell along the shared border of the two tiles
+        x = tx*tile_size
+        y = ty*tile_size
+        if direction == EAST:
+            x = min(x + tile_size, width) - 1
+            y += rng.randrange(min(tile_size, height - y))
+        else:
+            y = min(y + tile_size, height) - 1
+            x += rng.randrange(min(tile_size, width - x))
+        cells[y, x] |= direction
+
+
+def generate_tiled(width, height, tile_size=512, algorithm="backtracker",
+                   seed=0, workers=None):
+    """ Generate a width x height perfect maze in tiles across a process
+    pool and return it as a Maze.
+
+    Each tile is seeded from seed and its number (see bulk.maze_seed), so
+    the maze does not depend on the number of workers.
+    """
+
+    jobs = [(x, y, tile_width, tile_height, algorithm, maze_seed(seed, number))
+            for number, (x, y, tile_width, tile_height)
+            in enumerate(tiles(width, height, tile_size))]
+
+    maze = Maze(width, height)
+    with SharedArray((height, width), np.uint8) as cells:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(cells.spec,)) as pool:
+            for _ in pool.map(_generate_tile, jobs):
+                pass
+
+        stitch(cells.array, tile_size, random.Random(seed))
+        maze.cells[:] = cells.array
+
+    maze.visited_cells[:] = 1
+    return maze
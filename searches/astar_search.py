@@ -9,13 +9,31 @@ Last Updated: 2019-12-03
 
 import click
 import logging
+import os
 import structlog
 from structlog.stdlib import LoggerFactory
+# pygame says hello on stdout, which would end up in a --record - stream
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
 import pygame
 import random
+import sys
+import time
 from enum import Enum
 from pdb import set_trace
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+from common.grid import grid_options
+from common.recorder import FrameRecorder, use_dummy_driver
+from common.scheduler import FrameScheduler
+
+from grid import Grid
+from pathfinding import (HEURISTICS, find_path, find_path_steps,
+                         jump_point_search)
+from dstar_lite import DStarLite
+from landmarks import Landmarks
+from path_cache import PathCache
+
 structlog.configure(logger_factory=LoggerFactory())
 log = structlog.get_logger()
 
@@ -32,163 +50,185 @@ GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 CYAN = (0, 255, 255)
 YELLOW = (255,255,0)
+GREY = (96, 96, 96)
 
-WIDTH=800
-HEIGHT=600
-SQUARE_SIZE = 40
-MAX_X = int(WIDTH / SQUARE_SIZE) - 1
-MAX_Y = int(HEIGHT / SQUARE_SIZE) - 1
 
-
-def square_center(square):
+def square_center(geometry, square):
     """ Get the center of a given square. """
 
-    x = square[0]*SQUARE_SIZE + 1 + SQUARE_SIZE / 2
-    y = square[1]*SQUARE_SIZE + 1 + SQUARE_SIZE / 2
+    x = square[0]*geometry.square_size + 1 + geometry.square_size / 2
+    y = square[1]*geometry.square_size + 1 + geometry.square_size / 2
 
     return (x,y)
 
 
-def get_neighbors(square, clicked_squares=[], plus_only=False):
-    """ Get a list of the neighbors for a square. """
+class GridRenderer:
+    """ Draw the grid, repainting only the squares that changed.
 
-    neighbors = []
+    The grid lines come from the geometry's cached surface.  Changes to the
+    barriers, path, neighbors and start/end squares mark the squares they
+    touch as dirty, and draw() repaints just those squares (background,
+    path, path lines, then the square's own color) and returns their rects
+    for pygame.display.update().  Nothing changing means nothing is drawn.
+    """
 
-    # Loop over the possible x positions
-    for i in [square[0] - 1, square[0], square[0] + 1]:
+    def __init__(self, surface, geometry, grid, start_square, end_square):
 
-        # make sure we stay in our region
-        if i < 0 or i > MAX_X:
-            continue
+        self.surface = surface
+        self.geometry = geometry
+        self.grid = grid
+        self.start_square = tuple(start_square)
+        self.end_square = tuple(end_square)
 
-        # Loop over the possible y positions
-        for j in [square[1] - 1, square[1], square[1] + 1]:
+        self.background = geometry.lines(BLACK, WHITE)
 
-            # make sure we stay in our region
-            if j < 0 or j > MAX_Y:
-                continue
+        self.path_squares = []
+        self.path = set()
+        self.segments = {}
+        self.neighbors = set()
+        self.searched = set()
 
-            # skip the given square
-            if i == square[0] and j == square[1]:
-                continue
+        self.dirty = set()
+        self.redraw_all = True
 
-            # Include/Exclude the diagonal paths
-            if plus_only is True:
-                if  i == square[0] - 1 and j !=  square[1]:
-                    continue
-                if  i == square[0] + 1 and j !=  square[1]:
-                    continue
+    def mark(self, square):
+        """ Mark a square as needing a repaint. """
 
-            # Deal with barriers
-            if [i,j] in clicked_squares:
-                continue
+        if self.grid.in_bounds(square):
+            self.dirty.add((square[0], square[1]))
 
-            neighbors.append([i,j])
+    def _mark_around(self, square):
+        """ Mark a square and the squares around it (path lines between
+        neighboring squares can clip the squares next to them). """
 
-    return neighbors
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                self.mark((square[0] + dx, square[1] + dy))
 
+    def set_path(self, path_squares):
+        """ Set the path (in find_path order) to draw. """
 
-class PathNode:
-    """ Store the path square information. """
+        for square in self.segments:
+            self._mark_around(square)
 
-    def __init__(self, parent=None, pos=None, start_square=None, end_square=None):
+        self.path_squares = path_squares
+        self.path = set(tuple(square) for square in path_squares)
 
-        self.parent_node = parent
-        self.pos = pos
-        self.start_square = start_square
-        self.end_square = end_square
+        # path lines, filed under both of their end squares
+        self.segments = {}
+        last_square = self.start_square
+        for square in path_squares[::-1]:
+            square = tuple(square)
+            segment = (last_square, square)
+            self.segments.setdefault(last_square, []).append(segment)
+            self.segments.setdefault(square, []).append(segment)
+            last_square = square
+
+        for square in self.segments:
+            self._mark_around(square)
 
-        self.f = 0
-        self.g = 0
-        self.h = 0
+    def set_neighbors(self, neighbors):
+        """ Set the neighbor squares to highlight. """
 
-        self.set_h()
+        for square in self.neighbors:
+            self.mark(square)
 
-    def set_h(self):
-        """ Simple h generator. """
+        self.neighbors = set(tuple(square) for square in neighbors)
 
-        self.h = ((self.end_square[0] - self.pos[0])
-                  + (self.end_square[1] - self.pos[1]))
+        for square in self.neighbors:
+            self.mark(square)
 
-    def __repr__(self):
-        return f"<PathNode: {self.pos}>"
+    def add_searched(self, squares):
+        """ Add squares a running search has expanded. """
 
+        for square in squares:
+            self.searched.add(tuple(square))
+            self.mark(square)
 
-def find_path(start_square, end_square, clicked_squares, plus_only=False):
+    def clear_searched(self):
+        """ Drop the squares the last search expanded. """
 
-    # initial set up
-    open_list = []
-    closed_list = []
+        for square in self.searched:
+            self.mark(square)
+        self.searched = set()
 
-    open_list.append(PathNode(parent=None,
-                              pos=start_square,
-                              start_square=start_square,
-                              end_square=end_square))
+    def move_start(self, square):
+        """ Move the start square, dropping the old path. """
 
-    # Run until we've found the path
-    searching = True
-    while searching:
+        self.set_path([])
+        self.mark(self.start_square)
+        self.start_square = tuple(square)
+        self.mark(self.start_square)
 
-        # Stop when we get have explored all paths
-        if len(open_list) == 0:
-            break
+    def move_end(self, square):
+        """ Move the end square, dropping the old path. """
+
+        self.set_path([])
+        self.mark(self.end_square)
+        self.end_square = tuple(square)
+        self.mark(self.end_square)
+
+    def _square_color(self, square):
+        """ Get the color drawn over the path for a square, if any. """
 
-        # Sort the path nodes to find the shortest so far
-        open_list = sorted(open_list, key=lambda entry: -entry.g)
-        q = open_list.pop()
+        if square == self.end_square:
+            return RED
+        if square == self.start_square:
+            return GREEN
+        if self.grid.is_barrier(square):
+            return BLUE
+        if square in self.neighbors:
+            return CYAN
+        return None
 
-        # loop over all the neighbors and update the path information
-        for neighbor in get_neighbors(q.pos, clicked_squares, plus_only=plus_only):
+    def _draw_square(self, square):
+
+        # the square along with the grid lines on its top and left
+        bounds = self.geometry.square_rect(square)
+        inside = pygame.Rect(bounds.x + 1, bounds.y + 1,
+                             bounds.width - 1, bounds.height - 1)
 
-            node = PathNode(parent=q,
-                            pos = neighbor,
-                            start_square=start_square,
-                            end_square=end_square)
-            node.g = q.g + 1
-            node.f = node.g + node.h
+        self.surface.blit(self.background, bounds, bounds)
+        self.surface.set_clip(bounds)
 
-            # Stop searching when we get to the end
-            if neighbor == end_square:
-                searching = False
-                break
+        if square in self.path:
+            pygame.draw.rect(self.surface, YELLOW, inside)
+        elif square in self.searched:
+            pygame.draw.rect(self.surface, GREY, inside)
+
+        # any path line ending in this square or one next to it
+        segments = set()
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                segments.update(self.segments.get((square[0] + dx,
+                                                   square[1] + dy), []))
+        for last_square, next_square in segments:
+            pygame.draw.line(self.surface, RED,
+                    (square_center(self.geometry, last_square)),
+                    (square_center(self.geometry, next_square)), 2)
+
+        color = self._square_color(square)
+        if color is not None:
+            pygame.draw.rect(self.surface, color, inside)
+
+        self.surface.set_clip(None)
+        return bounds
+
+    def draw(self):
+        """ Repaint the dirty squares and return the rects that changed. """
+
+        if self.redraw_all is True:
+            self.redraw_all = False
+            self.dirty = set()
+            self.surface.blit(self.background, (0, 0))
+            for x in range(self.grid.width):
+                for y in range(self.grid.height):
+                    self._draw_square((x, y))
+            return [self.surface.get_rect()]
 
-            # check to see if we already have the node in the open list with
-            # a better f value
-            check_open = False
-            for open_node in open_list:
-                if node.pos == open_node.pos and open_node.f <= node.f:
-                    check_open = True
-                    break
-            if check_open is True:
-                continue
-
-            # check to see if we already have the node in the closed list with
-            # a better f value
-            check_closed = False
-            for closed_node in closed_list:
-                if node.pos == closed_node.pos and closed_node.f <= node.f:
-                    check_closed = True
-                    continue
-            if check_closed is True:
-                continue
-
-            # if we make it this far, add the neighbor node to the open list
-            open_list.append(node)
-
-        # add the node to the closed list
-        closed_list.append(q)
-
-    # open_list = sorted(open_list, key=lambda entry: -entry.g)
-    last = node
-
-    # build the path backwards from finish to start
-    best_path = []
-    while True:
-        if last.parent_node is None:
-            break
-        best_path.append(last.pos)
-        last = last.parent_node
-    return best_path
+        rects = [self._draw_square(square) for square in self.dirty]
+        self.dirty = set()
+        return rects
 
 
 @click.command()
@@ -196,28 +236,110 @@ def find_path(start_square, end_square, clicked_squares, plus_only=False):
                 help="Draw neighbors on click")
 @click.option("-p", "--plus-only", is_flag=True, default=False,
                 help="Set neighbors to only up/down and left/right")
+@click.option("-i", "--incremental", is_flag=True, default=False,
+                help="Keep the search state between searches (D* Lite)")
+@click.option("-j", "--jump-points", is_flag=True, default=False,
+                help="Use Jump Point Search")
+@click.option("-H", "--heuristic", type=click.Choice(sorted(HEURISTICS)),
+                default=None, help="Heuristic (default: manhattan for "
+                "--plus-only, otherwise chebyshev)")
+@click.option("-l", "--landmarks", type=int, default=0,
+                help="Use an ALT heuristic with this many landmarks")
+@click.option("--landmark-file", type=click.Path(dir_okay=False), default=None,
+                help="Load/save the landmark tables here")
+@click.option("--cache-size", type=int, default=128,
+                help="Number of paths to keep in the path cache (0 for "
+                     "none, not used with --incremental or --animate)")
+@click.option("-a", "--animate", is_flag=True, default=False,
+                help="Step through the search, showing the squares expanded")
+@click.option("--rate", type=float, default=30,
+                help="Search steps per second when animating (0 for as "
+                     "many as fit in the budget)")
+@click.option("--speed", type=float, default=1.0,
+                help="Speed multiplier for --rate (up/down arrows change it)")
+@click.option("--budget", type=float, default=12,
+                help="Milliseconds of searching per frame")
+@click.option("-d", "--density", type=float, default=0,
+                help="Start with this fraction of the squares as barriers")
+@click.option("--seed", type=int, default=None,
+                help="Random seed for --density")
+@click.option("--record", "record_path", type=str, default=None,
+                help="Search straight away without a window, writing the "
+                     "frames to a PNG pattern/directory or raw RGB "
+                     "(.rgb or - for stdout)")
 @click.option("-v", "--verbose", is_flag=True, default=False,
               help="Show debuggging information")
-def main(verbose, plus_only, draw_neighbors):
+# room for the start and end squares, one in from opposite corners
+@grid_options(800, 600, 40, min_columns=4, min_rows=4)
+def main(verbose, plus_only, draw_neighbors, incremental, jump_points,
+         heuristic, landmarks, landmark_file, cache_size, animate, rate,
+         speed, budget, density, seed, record_path, geometry):
 
     if verbose is True:
         logging.basicConfig(level=logging.DEBUG)
     else:
         logging.basicConfig(level=logging.WARNING)
 
+    # D* Lite keeps its own search state, so it can't be combined with the
+    # other searches, heuristics or the animation
+    if incremental is True:
+        given = [name for name, value in (
+                    ("--jump-points", jump_points),
+                    ("--heuristic", heuristic is not None),
+                    ("--landmarks", landmarks > 0),
+                    ("--animate", animate),
+                    ("--record", record_path is not None)) if value]
+        if given:
+            raise click.UsageError(f"--incremental can't be used with "
+                                   f"{', '.join(given)}")
+
+    # jump point search has no steps to animate
+    if jump_points is True and (animate is True or record_path is not None):
+        raise click.UsageError("--jump-points can't be used with --animate "
+                               "or --record")
+
     # initialize everything
+    if record_path is not None:
+        use_dummy_driver()
     pygame.init()
     pygame.font.init()
 
-    gDisplay = pygame.display.set_mode((WIDTH,HEIGHT))
+    gDisplay = pygame.display.set_mode(geometry.size)
     clock = pygame.time.Clock()
 
+    # Recordings are drawn offscreen, as fast as they can be, and animate
+    # the search
+    recorder = None
+    if record_path is not None:
+        recorder = FrameRecorder(record_path, 30)
+        gDisplay = pygame.Surface(geometry.size)
+        animate = True
+
     start_square = [1,1]
-    end_square = [MAX_X-1,MAX_Y-1]
-    clicked_squares = []
+    end_square = [geometry.max_x - 1, geometry.max_y - 1]
+    grid = Grid.random(geometry.columns, geometry.rows, density, seed=seed,
+                       keep_clear=(start_square, end_square))
     path_squares = []
     neighbors = []
 
+    alt = None
+    cache = PathCache(cache_size) if cache_size > 0 else None
+    planner = None
+    if incremental is True:
+        planner = DStarLite(grid, start_square, end_square, plus_only)
+
+    renderer = GridRenderer(gDisplay, geometry, grid, start_square,
+                            end_square)
+
+    # a search being animated
+    # (recordings go by the time in the recording)
+    now = time.perf_counter if recorder is None else recorder.time
+    scheduler = FrameScheduler(budget, rate, speed, clock=now)
+    search = None
+
+    # a recording searches straight away and stops when it's found the path
+    replan = recorder is not None
+
     running = True
     while running:
 
@@ -231,86 +353,126 @@ def main(verbose, plus_only, draw_neighbors):
 
                 # Add/Remove a barrier
                 if pygame.mouse.get_pressed() == (1,0,0):
-                    pos = pygame.mouse.get_pos()
-                    x = pos[0]
-                    y = pos[1]
-                    new_square = [int(x/SQUARE_SIZE),int(y/SQUARE_SIZE)]
+                    new_square = geometry.square_at(pygame.mouse.get_pos())
+
+                    # The window can be wider or taller than the grid
+                    if not grid.in_bounds(new_square):
+                        continue
 
                     # Draw neighbors of the clicked square as well
                     # this is mostly for testing purposes
                     if draw_neighbors is True:
-                        neighbors = get_neighbors(new_square,
+                        neighbors = grid.neighbors(new_square,
                                 plus_only=plus_only)
+                        renderer.set_neighbors(neighbors)
 
                     # Don't do anything to the start/end squares
                     if new_square == start_square or new_square == end_square:
                         continue
 
                     # toggle the barrier on or off
-                    if new_square in clicked_squares:
-                        clicked_squares.remove(new_square)
-                    else:
-                        clicked_squares.append(new_square)
+                    search = None
+                    grid.toggle(new_square)
+                    renderer.mark(new_square)
+                    if planner is not None:
+                        planner.barriers_changed([new_square])
 
                 # Run the search
                 elif pygame.mouse.get_pressed() == (0,0,1):
-                    path_squares = find_path(start_square, end_square,
-                            clicked_squares, plus_only)
-                    neighbors = []
-
-        gDisplay.fill(BLACK)
-
-        # Draw the grid
-        for i in range(1,int(WIDTH/SQUARE_SIZE)):
-            x = SQUARE_SIZE*i
-            pygame.draw.line(gDisplay, WHITE, (x,0), (x,HEIGHT),1)
-
-        for i in range(1,int(HEIGHT/SQUARE_SIZE)):
-            y = SQUARE_SIZE*i
-            pygame.draw.line(gDisplay, WHITE, (0,y), (WIDTH,y),1)
-
-        # Draw best path
-        if path_squares is not None:
-            last_square = start_square
-            for square in path_squares[::-1]:
-                x = square[0]*SQUARE_SIZE + 1
-                y = square[1]*SQUARE_SIZE + 1
-                pygame.draw.rect(gDisplay, YELLOW,
-                        pygame.Rect(x,y,SQUARE_SIZE - 1, SQUARE_SIZE - 1))
-                pygame.draw.line(gDisplay, RED,
-                        (square_center(last_square)),
-                        (square_center(square)), 2)
-                last_square = square
-
-        # Draw neighbors of clicked squares (if enabled)
-        for square in neighbors:
-            x = square[0]*SQUARE_SIZE + 1
-            y = square[1]*SQUARE_SIZE + 1
-            pygame.draw.rect(gDisplay, CYAN, pygame.Rect(x,y,SQUARE_SIZE - 1,
-                SQUARE_SIZE - 1))
-
-        # Draw clicked squares
-        for square in clicked_squares:
-            x = square[0]*SQUARE_SIZE + 1
-            y = square[1]*SQUARE_SIZE + 1
-            pygame.draw.rect(gDisplay, BLUE, pygame.Rect(x,y,SQUARE_SIZE - 1,
-                SQUARE_SIZE - 1))
-
-        # Draw Start Square
-        x = start_square[0]*SQUARE_SIZE + 1
-        y = start_square[1]*SQUARE_SIZE + 1
-        pygame.draw.rect(gDisplay, GREEN, pygame.Rect(x,y,SQUARE_SIZE - 1,
-            SQUARE_SIZE - 1))
-
-        # Draw End Square
-        x = end_square[0]*SQUARE_SIZE + 1
-        y = end_square[1]*SQUARE_SIZE + 1
-        pygame.draw.rect(gDisplay, RED, pygame.Rect(x,y,SQUARE_SIZE - 1,
-            SQUARE_SIZE - 1))
-
-
-        pygame.display.update()
-        clock.tick(30)
+                    replan = True
+
+            # Move the start (s) or end (e) square to the mouse
+            if event.type == pygame.KEYDOWN and event.key in (pygame.K_s,
+                                                              pygame.K_e):
+                new_square = geometry.square_at(pygame.mouse.get_pos())
+
+                if not grid.in_bounds(new_square):
+                    continue
+                if grid.is_barrier(new_square):
+                    continue
+                if new_square == start_square or new_square == end_square:
+                    continue
+
+                # the old path no longer joins the start and end
+                path_squares = []
+                search = None
+                renderer.clear_searched()
+
+                if event.key == pygame.K_s:
+                    start_square = new_square
+                    renderer.move_start(start_square)
+                    if planner is not None:
+                        planner.move_start(start_square)
+                else:
+                    end_square = new_square
+                    renderer.move_end(end_square)
+                    if planner is not None:
+                        planner.move_end(end_square)
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_UP:
+                scheduler.faster()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_DOWN:
+                scheduler.slower()
+
+        # Run the search
+        if replan is True:
+            replan = False
+            if planner is not None:
+                path_squares = planner.find_path()
+                debug("replanned", expanded=planner.nodes_expanded)
+            else:
+                h = HEURISTICS.get(heuristic)
+
+                # landmark tables only hold for the barriers they
+                # were built from
+                if landmarks > 0:
+                    if alt is None or not alt.is_current(grid):
+                        alt = Landmarks.for_grid(grid, landmark_file,
+                                landmarks, plus_only)
+                        debug("built landmarks", landmarks=alt.landmarks)
+                    h = alt
+
+                search_path = (jump_point_search
+                               if jump_points is True else find_path)
+                if animate is True:
+                    search = find_path_steps(start_square,
+                            end_square, grid, plus_only, heuristic=h)
+                    path_squares = []
+                elif cache is not None:
+                    path_squares = cache.find_path(start_square,
+                            end_square, grid, plus_only, heuristic=h,
+                            search=search_path)
+                else:
+                    path_squares = search_path(start_square,
+                            end_square, grid, plus_only, heuristic=h)
+            neighbors = []
+            renderer.clear_searched()
+            renderer.set_path(path_squares)
+            renderer.set_neighbors(neighbors)
+
+        # Step the search being animated
+        if search is not None:
+            renderer.add_searched(scheduler.advance(search))
+            if scheduler.done is True:
+                path_squares = scheduler.result
+                renderer.set_path(path_squares)
+                search = None
+            pygame.display.set_caption(
+                    f"A* {scheduler.steps_per_second:.0f} steps/s")
+
+        # Only push the squares that changed to the display
+        rects = renderer.draw()
+        if recorder is not None:
+            recorder.add(gDisplay)
+            running = search is not None
+        else:
+            if rects:
+                pygame.display.update(rects)
+            clock.tick(30)
+
+    if recorder is not None:
+        recorder.close()
+        info("Recorded frames", frames=recorder.frames, path=record_path)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""Batch path finding across a process pool
+
+Filename: batch.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+Answers many start/end queries against the same barrier layout.  The barrier
+array is copied once into shared memory and every worker process wraps it in
+a Grid, so only the queries and the resulting paths cross process lines.
+
+    python batch.py -s 1000 -q 2000 -w 8
+"""
+
+import click
+import numpy as np
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+from common.shared import SharedArray, attach
+
+from grid import Grid
+from pathfinding import SEARCHES
+
+# A worker process's grid and search
+_worker = {}
+
+
+def _init_worker(barriers, plus_only, algorithm):
+    """ Wrap the shared barriers in the worker's grid. """
+
+    _worker["grid"] = Grid.from_barriers(attach(barriers))
+    _worker["plus_only"] = plus_only
+    _worker["search"] = SEARCHES[algorithm]
+
+
+def _run_queries(queries):
+    """ Run a chunk of (start_x, start_y, end_x, end_y) queries. """
+
+    grid = _worker["grid"]
+    search = _worker["search"]
+    plus_only = _worker["plus_only"]
+
+    paths = []
+    for start_x, start_y, end_x, end_y in queries.tolist():
+        path = search([start_x, start_y], [end_x, end_y], grid, plus_only)
+        paths.append(np.array(path, dtype=np.int32).reshape(-1, 2))
+
+    return paths
+
+
+def find_paths(grid, queries, plus_only=False, algorithm="astar",
+               workers=None, chunksize=64):
+    """ Find the paths for an array of queries across a process pool.
+
+    queries is an (n, 4) array of start_x, start_y, end_x, end_y rows.  The
+    result is a list of n int32 arrays of shape (length, 2), each in the same
+    order as find_path (backwards from the end square, without the start
+    square); unreachable ends give an empty array.
+    """
+
+    queries = np.asarray(queries, dtype=np.int32).reshape(-1, 4)
+    chunks = [queries[i:i + chunksize]
+              for i in range(0, len(queries), chunksize)]
+
+    with SharedArray(grid.shape, bool) as barriers:
+        barriers.array[:] = grid.barriers
+
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(barriers.spec, plus_only,
+                                           algorithm)) as pool:
+            paths = []
+            for chunk_paths in pool.map(_run_queries, chunks):
+                paths.extend(chunk_paths)
+
+    return paths
+
+
+def random_queries(grid, count, seed=None):
+    """ Pick random start/end pairs on open squares of the grid. """
+
+    rng = np.random.default_rng(seed)
+    open_squares = np.argwhere(~grid.barriers)
+    picks = rng.integers(0, len(open_squares), size=(count, 2))
+
+    return np.hstack([open_squares[picks[:, 0]], open_squares[picks[:, 1]]])
+
+
+@click.command()
+@click.option("-s", "--size", type=click.IntRange(min=1), default=500,
+              help="Grid size")
+@click.option("-d", "--density", type=float, default=0.2,
+              help="Barrier density")
+@click.option("-q", "--queries", "count", type=int, default=1000,
+              help="Number of start/end queries")
+@click.option("-w", "--workers", type=int, default=os.cpu_count(),
+              help="Number of worker processes")
+@click.option("-a", "--algorithm", type=click.Choice(sorted(SEARCHES)),
+              default="astar", help="Search algorithm")
+@click.option("-p", "--plus-only", is_flag=True, default=False,
+              help="Set neighbors to only up/down and left/right")
+@click.option("--chunksize", type=int, default=64,
+              help="Queries sent to a worker at a time")
+@click.option("--seed", type=int, default=0, help="Random seed")
+def main(size, density, count, workers, algorithm, plus_only, chunksize, seed):
+
+    grid = Grid.random(size, size, density, seed=seed)
+    queries = random_queries(grid, count, seed=seed)
+
+    start_time = time.perf_counter()
+    paths = find_paths(grid, queries, plus_only, algorithm, workers, chunksize)
+    wall_time = time.perf_counter() - start_time
+
+    found = sum(1 for path in paths if len(path) > 0)
+    print(f"{count} queries ({found} reachable) on {workers} workers in "
+          f"{wall_time:.3f}s: {count / wall_time:.1f} queries/s",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
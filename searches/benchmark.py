@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""Headless benchmark for find_path
+
+Filename: benchmark.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+Runs the path search over randomly generated square grids without opening a
+window and reports, for each run, the nodes expanded, the peak size of the
+open set, the wall time and the peak memory used by the search.
+
+    python benchmark.py -s 50 -s 500 -s 2000 -d 0.1 -d 0.3 -f csv
+"""
+
+import click
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+from common.results import write_results
+
+from grid import Grid
+from landmarks import Landmarks
+from pathfinding import SEARCHES
+
+FIELDS = ["algorithm", "size", "density", "seed", "plus_only", "landmarks",
+          "path_length", "nodes_expanded", "peak_open", "preprocess_time",
+          "wall_time", "peak_memory"]
+
+
+def run_benchmark(size, density, seed, plus_only, algorithm="astar",
+                  landmarks=0, measure_memory=True):
+    """ Run a single search on a random size x size grid.
+
+    The search runs from the top left corner to the bottom right corner.  The
+    wall time comes from an untraced run; when measure_memory is set the
+    search is run a second time under tracemalloc to get the peak memory.
+    With landmarks the ALT tables are built first and timed separately.
+    """
+
+    search = SEARCHES[algorithm]
+
+    start_square = [0, 0]
+    end_square = [size - 1, size - 1]
+    grid = Grid.random(size, size, density, seed=seed,
+                       keep_clear=[start_square, end_square])
+
+    heuristic = None
+    preprocess_time = 0
+    if landmarks > 0:
+        start_time = time.perf_counter()
+        heuristic = Landmarks.build(grid, landmarks, plus_only, seed=seed)
+        preprocess_time = time.perf_counter() - start_time
+
+    stats = {}
+    start_time = time.perf_counter()
+    path = search(start_square, end_square, grid, plus_only, stats=stats,
+                  heuristic=heuristic)
+    wall_time = time.perf_counter() - start_time
+
+    peak_memory = None
+    if measure_memory is True:
+        tracemalloc.start()
+        search(start_square, end_square, grid, plus_only, heuristic=heuristic)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {"algorithm": algorithm,
+            "size": size,
+            "density": density,
+            "seed": seed,
+            "plus_only": plus_only,
+            "landmarks": landmarks,
+            "path_length": len(path),
+            "nodes_expanded": stats["nodes_expanded"],
+            "peak_open": stats["peak_open"],
+            "preprocess_time": preprocess_time,
+            "wall_time": wall_time,
+            "peak_memory": peak_memory}
+
+
+@click.command()
+@click.option("-s", "--size", "sizes", type=click.IntRange(min=1),
+              multiple=True, default=[50, 100, 200, 500, 1000],
+              help="Grid size (repeatable)")
+@click.option("-d", "--density", "densities", type=float, multiple=True,
+              default=[0.2], help="Barrier density (repeatable)")
+@click.option("-a", "--algorithm", "algorithms", multiple=True,
+              type=click.Choice(sorted(SEARCHES)), default=["astar"],
+              help="Search algorithm (repeatable)")
+@click.option("-l", "--landmarks", type=int, default=0,
+              help="Use an ALT heuristic with this many landmarks")
+@click.option("--seed", type=int, default=0, help="Random seed")
+@click.option("-m", "--mode", type=click.Choice(["plus", "diagonal", "both"]),
+              default="both", help="Neighbor mode(s) to run")
+@click.option("-f", "--format", "fmt", type=click.Choice(["json", "csv"]),
+              default="json", help="Output format")
+@click.option("-o", "--output", type=click.File("w"), default="-",
+              help="Output file (default stdout)")
+@click.option("--no-memory", is_flag=True, default=False,
+              help="Skip the traced run used to measure peak memory")
+def main(sizes, densities, algorithms, landmarks, seed, mode, fmt, output,
+         no_memory):
+
+    modes = {"plus": [True], "diagonal": [False], "both": [True, False]}[mode]
+
+    results = []
+    for size in sizes:
+        for density in densities:
+            for plus_only in modes:
+                for algorithm in algorithms:
+                    result = run_benchmark(size, density, seed, plus_only,
+                                           algorithm, landmarks,
+                                           measure_memory=not no_memory)
+                    print(f"{algorithm} size={size} density={density} "
+                          f"plus_only={plus_only} "
+                          f"expanded={result['nodes_expanded']} "
+                          f"time={result['wall_time']:.3f}s", file=sys.stderr)
+                    results.append(result)
+
+    write_results(results, output, fmt, FIELDS)
+
+
+if __name__ == "__main__":
+    main()
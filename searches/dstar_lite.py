@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+"""Incremental path planning with D* Lite
+
+Filename: dstar_lite.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+D* Lite searches backwards from the end square and keeps its g/rhs values
+between searches.  When a barrier is toggled only the squares whose costs
+actually changed are put back on the queue, so a replan repairs the part of
+the search tree that the change touched instead of starting from scratch.
+
+See: S. Koenig and M. Likhachev, "D* Lite", AAAI 2002.
+"""
+
+import heapq
+import math
+
+from grid import neighbor_offsets
+from pathfinding import default_heuristic
+
+INF = math.inf
+
+
+class DStarLite:
+    """ Incremental planner over a Grid.
+
+    The planner reads barriers straight from the grid, so the grid should be
+    changed first and then the planner told which squares changed:
+
+        grid.toggle(square)
+        planner.barriers_changed([square])
+        path = planner.find_path()
+    """
+
+    def __init__(self, grid, start_square, end_square, plus_only=False):
+
+        self.grid = grid
+        self.plus_only = plus_only
+        self.offsets = [tuple(offset)
+                        for offset in neighbor_offsets(plus_only).tolist()]
+
+        self.h = default_heuristic(plus_only)
+
+        self.start = tuple(start_square)
+        self.end = tuple(end_square)
+
+        # number of nodes expanded by the last call to find_path
+        self.nodes_expanded = 0
+
+        self.reset()
+
+    def reset(self):
+        """ Throw away all of the search state. """
+
+        self.g = {}
+        self.rhs = {self.end: 0}
+        self.km = 0
+        self.last_start = self.start
+
+        # the queue uses lazy deletion: a heap entry is only live if its key
+        # matches the key stored for the square in queue_keys
+        self.queue = []
+        self.queue_keys = {}
+        self._push(self.end, self._key(self.end))
+
+    def _key(self, square):
+
+        g = min(self.g.get(square, INF), self.rhs.get(square, INF))
+        return (g + self.h(self.start, square) + self.km, g)
+
+    def _push(self, square, key):
+
+        self.queue_keys[square] = key
+        heapq.heappush(self.queue, (key, square))
+
+    def _top_key(self):
+        """ Get the smallest live key, dropping stale heap entries. """
+
+        while self.queue:
+            key, square = self.queue[0]
+            if self.queue_keys.get(square) == key:
+                return key
+            heapq.heappop(self.queue)
+        return (INF, INF)
+
+    def _neighbors(self, square):
+        """ Get the on-grid neighbors of a square (barriers included). """
+
+        width, height = self.grid.shape
+        for dx, dy in self.offsets:
+            x = square[0] + dx
+            y = square[1] + dy
+            if 0 <= x < width and 0 <= y < height:
+                yield (x, y)
+
+    def _cost(self, a, b):
+        """ Cost of stepping between two neighboring squares. """
+
+        barriers = self.grid.barriers
+        if barriers[a[0], a[1]] or barriers[b[0], b[1]]:
+            return INF
+        return 1
+
+    def _update_vertex(self, square):
+
+        if square != self.end:
+            self.rhs[square] = min((self._cost(square, n) + self.g.get(n, INF)
+                                    for n in self._neighbors(square)),
+                                   default=INF)
+
+        self.queue_keys.pop(square, None)
+        if self.g.get(square, INF) != self.rhs.get(square, INF):
+            self._push(square, self._key(square))
+
+    def _compute_shortest_path(self):
+
+        expanded = 0
+        while (self._top_key() < self._key(self.start)
+               or self.rhs.get(self.start, INF) != self.g.get(self.start, INF)):
+
+            k_old, u = heapq.heappop(self.queue)
+            del self.queue_keys[u]
+            expanded += 1
+
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u, k_new)
+            elif self.g.get(u, INF) > self.rhs.get(u, INF):
+                self.g[u] = self.rhs[u]
+                for n in self._neighbors(u):
+                    self._update_vertex(n)
+            else:
+                self.g[u] = INF
+                self._update_vertex(u)
+                for n in self._neighbors(u):
+                    self._update_vertex(n)
+
+        self.nodes_expanded = expanded
+
+    def barriers_changed(self, squares):
+        """ Tell the planner that the barrier state of squares changed. """
+
+        for square in squares:
+            square = tuple(square)
+            self._update_vertex(square)
+            for n in self._neighbors(square):
+                self._update_vertex(n)
+
+    def move_start(self, square):
+        """ Move the start square, keeping the search state. """
+
+        self.start = tuple(square)
+        self.km += self.h(self.last_start, self.start)
+        self.last_start = self.start
+
+    def move_end(self, square):
+        """ Move the end square.
+
+        The search tree is rooted at the end square, so this starts over.
+        """
+
+        self.end = tuple(square)
+        self.reset()
+
+    def find_path(self):
+        """ Get the current best path.
+
+        The path has the same shape as pathfinding.find_path: it runs
+        backwards from the end square and does not include the start square.
+        An unreachable end square gives an empty path.
+        """
+
+        self._compute_shortest_path()
+
+        if self.g.get(self.start, INF) == INF:
+            return []
+
+        # walk downhill on g from the start square to the end square
+        square = self.start
+        forward = []
+        while square != self.end:
+            square = min(self._neighbors(square),
+                         key=lambda n: self._cost(square, n) + self.g.get(n, INF))
+            forward.append(list(square))
+
+        return forward[::-1]
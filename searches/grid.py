@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""Barrier grid for the A* example
+
+Filename: grid.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+"""
+
+import hashlib
+
+import numpy as np
+
+# the searches get the offset tables from here
+from common.offsets import flat_offsets, neighbor_offsets
+
+
+def square_keys(cells):
+    """ Get the Zobrist keys for an array of cell ids (x*height + y).
+
+    Rather than storing a table of random keys, each key is the splitmix64
+    mix of the cell id.
+    """
+
+    z = np.asarray(cells, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class Grid:
+    """ Occupancy grid holding the barrier squares.
+
+    The barriers are kept in a (width, height) boolean array indexed as
+    barriers[x, y], so toggling a square and checking a square are both O(1).
+
+    Lookup tables built from the barriers by the searches are cached on the
+    grid.  toggle() drops them and bumps the version counter; anything that
+    writes to barriers directly must call changed() afterwards.
+
+    The grid also keeps a Zobrist hash of its barriers, updated in O(1) by
+    toggle(), so toggling a square back gives the same hash again.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.barriers = np.zeros((width, height), dtype=bool)
+        self.version = 0
+        self.hash = 0
+        self._cache = {}
+
+    @classmethod
+    def from_barriers(cls, barriers):
+        """ Wrap an existing (width, height) boolean array without copying. """
+
+        grid = cls.__new__(cls)
+        grid.width, grid.height = barriers.shape
+        grid.barriers = barriers
+        grid.version = 0
+        grid._cache = {}
+        grid.hash = grid._full_hash()
+
+        return grid
+
+    @classmethod
+    def random(cls, width, height, density, seed=None, keep_clear=()):
+        """ Build a grid with randomly placed barriers.
+
+        Each square is a barrier with probability density.  Any squares in
+        keep_clear (e.g. the start and end squares) are left open.
+        """
+
+        grid = cls(width, height)
+        rng = np.random.default_rng(seed)
+        grid.barriers[:] = rng.random((width, height)) < density
+
+        for square in keep_clear:
+            grid.barriers[square[0], square[1]] = False
+
+        grid.changed()
+        return grid
+
+    @property
+    def shape(self):
+        return self.barriers.shape
+
+    def in_bounds(self, square):
+        """ Check that a square is on the grid. """
+
+        return 0 <= square[0] < self.width and 0 <= square[1] < self.height
+
+    def is_barrier(self, square):
+        """ Check if a square is a barrier. """
+
+        return bool(self.barriers[square[0], square[1]])
+
+    def toggle(self, square):
+        """ Toggle the barrier on or off for a square. """
+
+        self.barriers[square[0], square[1]] ^= True
+        self.hash ^= int(square_keys([square[0]*self.height + square[1]])[0])
+
+        self.version += 1
+        self._cache = {}
+
+    def changed(self):
+        """ Drop the cached lookup tables and rehash after the barriers
+        were written to directly. """
+
+        self.hash = self._full_hash()
+        self.version += 1
+        self._cache = {}
+
+    def _full_hash(self):
+
+        keys = square_keys(np.flatnonzero(self.barriers))
+        return int(np.bitwise_xor.reduce(keys, initial=np.uint64(0)))
+
+    def cached(self, key, build):
+        """ Get a cached lookup table, building it with build() if needed. """
+
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def fingerprint(self):
+        """ Get a hash of the grid size and barriers (for files on disk). """
+
+        digest = hashlib.sha1(np.array(self.shape, dtype=np.int64).tobytes())
+        digest.update(np.packbits(self.barriers).tobytes())
+        return digest.hexdigest()
+
+    def barrier_squares(self):
+        """ Get a list of the barrier squares. """
+
+        return np.argwhere(self.barriers).tolist()
+
+    def open_moves(self, plus_only=False):
+        """ Get a bitmask of the open moves for every square.
+
+        Bit k of moves[x, y] is set when stepping by neighbor_offsets()[k]
+        from (x, y) stays on the grid and does not land on a barrier.  The
+        whole mask is built with one shifted slice per offset.
+        """
+
+        offsets = neighbor_offsets(plus_only)
+        free = ~self.barriers
+        moves = np.zeros(self.shape, dtype=np.uint8)
+
+        for k, (dx, dy) in enumerate(offsets):
+
+            # source and destination slices for this offset
+            src_x = slice(max(0, -dx), self.width - max(0, dx))
+            src_y = slice(max(0, -dy), self.height - max(0, dy))
+            dst_x = slice(max(0, dx), self.width - max(0, -dx))
+            dst_y = slice(max(0, dy), self.height - max(0, -dy))
+
+            moves[src_x, src_y] |= free[dst_x, dst_y].astype(np.uint8) << k
+
+        return moves
+
+    def neighbors(self, square, plus_only=False):
+        """ Get a list of the open neighbors for a square. """
+
+        candidates = neighbor_offsets(plus_only) + square
+
+        inside = ((candidates[:, 0] >= 0) & (candidates[:, 0] < self.width)
+                  & (candidates[:, 1] >= 0) & (candidates[:, 1] < self.height))
+        candidates = candidates[inside]
+        candidates = candidates[~self.barriers[candidates[:, 0],
+                                               candidates[:, 1]]]
+
+        return candidates.tolist()
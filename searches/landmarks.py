@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""Landmark (ALT) heuristic for static barrier layouts
+
+Filename: landmarks.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+For a handful of landmark squares L we store the true grid distance d(L, n)
+to every square n.  By the triangle inequality
+
+    d(n, t) >= |d(L, t) - d(L, n)|
+
+for every landmark, and the largest of those bounds is a much better
+estimate than Manhattan/Chebyshev distance once barriers get in the way,
+e.g. in maze-like layouts.  The tables only hold for the barriers they were
+built from, so they remember the grid version (and a fingerprint when saved
+to disk) and have to be rebuilt once the grid changes.
+
+See: A. Goldberg and C. Harrelson, "Computing the Shortest Path: A* Search
+Meets Graph Theory", SODA 2005.
+"""
+
+import numpy as np
+import os
+
+from grid import flat_offsets
+from pathfinding import default_heuristic
+
+# Distance stored for squares that cannot reach the landmark
+UNREACHABLE = -1
+
+
+def grid_distances(grid, source, plus_only=False):
+    """ Get the distance from source to every square on the grid.
+
+    This is a breadth first search where each step expands the whole
+    frontier at once with numpy, working on flat indices into a grid padded
+    with a closed border.  Barriers and squares that cannot be reached are
+    UNREACHABLE.
+    """
+
+    width, height = grid.shape
+    stride = height + 2
+
+    # open squares that have not been reached yet, with a closed border
+    unseen = np.pad(~grid.barriers, 1).ravel()
+    dist = np.full(unseen.shape, UNREACHABLE, dtype=np.int32)
+    deltas = np.array(flat_offsets(stride, plus_only))
+
+    start = (source[0] + 1)*stride + source[1] + 1
+    frontier = np.array([start])
+    if not unseen[start]:
+        frontier = frontier[:0]
+    unseen[frontier] = False
+    dist[frontier] = 0
+
+    step = 0
+    while frontier.size:
+        step += 1
+        candidates = (frontier[:, None] + deltas).ravel()
+        frontier = np.unique(candidates[unseen[candidates]])
+        unseen[frontier] = False
+        dist[frontier] = step
+
+    return dist.reshape(width + 2, height + 2)[1:-1, 1:-1]
+
+
+class Landmarks:
+    """ Landmark distance tables usable as a find_path heuristic.
+
+    The object is called like the other heuristics, heuristic(pos, end), and
+    returns the best landmark bound (never less than the plain heuristic for
+    the neighbor mode).
+    """
+
+    def __init__(self, landmarks, tables, plus_only=False, version=None,
+                 fingerprint=None, count=None):
+
+        self.landmarks = landmarks
+        # build() can run out of new squares before it has count landmarks,
+        # so the count asked for is kept to tell whether saved tables fit
+        self.count = len(landmarks) if count is None else count
+        self.plus_only = plus_only
+        self.version = version
+        self.fingerprint = fingerprint
+        self.base = default_heuristic(plus_only)
+
+        # (width, height, count) so the distances for a square are together
+        self.tables = np.ascontiguousarray(np.moveaxis(tables, 0, -1))
+
+        self._end = None
+        self._end_dist = None
+
+    @classmethod
+    def build(cls, grid, count=8, plus_only=False, seed=None):
+        """ Pick count landmarks on the grid and build their tables.
+
+        Landmarks are chosen farthest first: starting from a random open
+        square, each new landmark is the reachable square farthest from the
+        landmarks picked so far.
+        """
+
+        rng = np.random.default_rng(seed)
+        open_squares = np.argwhere(~grid.barriers)
+        if len(open_squares) == 0:
+            raise ValueError("No open squares to place landmarks on")
+
+        seed_square = open_squares[rng.integers(len(open_squares))].tolist()
+        closest = grid_distances(grid, seed_square, plus_only)
+
+        landmarks = []
+        tables = []
+        for i in range(count):
+            square = list(np.unravel_index(np.argmax(closest), grid.shape))
+            square = [int(square[0]), int(square[1])]
+            if square in landmarks:
+                break
+
+            dist = grid_distances(grid, square, plus_only)
+            landmarks.append(square)
+            tables.append(dist)
+
+            # distance to the nearest landmark, only over squares they reach
+            reached = dist != UNREACHABLE
+            if i == 0:
+                closest = np.where(reached, dist, UNREACHABLE)
+            else:
+                closest = np.where(reached & (closest != UNREACHABLE),
+                                   np.minimum(closest, dist), closest)
+
+        return cls(landmarks, np.array(tables), plus_only,
+                   version=grid.version, fingerprint=grid.fingerprint(),
+                   count=count)
+
+    @property
+    def cache_key(self):
+        """ Stand in for the tables in PathCache keys.  The grid hash there
+        already pins the layout they were built for. """
+
+        return ("alt", self.count)
+
+    def is_current(self, grid):
+        """ Check the tables were built for the grid as it is now. """
+
+        if self.version is not None and self.version == grid.version:
+            return True
+        return self.fingerprint == grid.fingerprint()
+
+    def save(self, path):
+        """ Save the tables to an .npz file. """
+
+        np.savez_compressed(path,
+                            landmarks=np.array(self.landmarks, dtype=np.int32),
+                            tables=np.moveaxis(self.tables, -1, 0),
+                            plus_only=self.plus_only,
+                            fingerprint=self.fingerprint,
+                            count=self.count)
+
+    @classmethod
+    def load(cls, path):
+        """ Load tables saved with save(). """
+
+        with np.load(path) as data:
+            # files saved before the count was kept hold as many as asked for
+            count = int(data["count"]) if "count" in data else None
+            return cls(data["landmarks"].tolist(), data["tables"],
+                       bool(data["plus_only"]),
+                       fingerprint=str(data["fingerprint"]), count=count)
+
+    @classmethod
+    def for_grid(cls, grid, path=None, count=8, plus_only=False, seed=None):
+        """ Load the tables for a grid from path, or build (and save) them.
+
+        Tables on disk are only used if they were built for the same
+        barriers, neighbor mode and landmark count.
+        """
+
+        if path is not None and os.path.exists(path):
+            landmarks = cls.load(path)
+            if (landmarks.plus_only == plus_only
+                    and landmarks.count == count
+                    and landmarks.is_current(grid)):
+                landmarks.version = grid.version
+                return landmarks
+
+        landmarks = cls.build(grid, count, plus_only, seed)
+        if path is not None:
+            landmarks.save(path)
+        return landmarks
+
+    def __call__(self, pos, end):
+
+        # the end square rarely changes, so hang on to its distances
+        end = (end[0], end[1])
+        if end != self._end:
+            self._end = end
+            self._end_dist = self.tables[end]
+
+        pos_dist = self.tables[pos[0], pos[1]]
+        usable = (pos_dist != UNREACHABLE) & (self._end_dist != UNREACHABLE)
+
+        estimate = self.base(pos, end)
+        if usable.any():
+            bound = np.abs(self._end_dist[usable] - pos_dist[usable]).max()
+            estimate = max(estimate, int(bound))
+        return estimate
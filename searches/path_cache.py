@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""LRU cache for path searches
+
+Filename: path_cache.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+"""
+
+import structlog
+from collections import OrderedDict
+
+from pathfinding import find_path
+
+log = structlog.get_logger()
+
+
+class PathCache:
+    """ Bounded LRU cache of search results.
+
+    Entries are keyed on the grid size and barrier hash (see Grid.hash) along
+    with the start and end squares, the neighbor mode, the search function
+    and the heuristic.  A heuristic with a cache_key attribute is keyed on
+    that instead of itself, so one rebuilt for every layout (like Landmarks)
+    isn't kept alive by the entries and still hits them once rebuilt.
+    Toggling a barrier changes the hash so old paths are never handed back
+    for a different layout, while toggling it back again hits the entries
+    from before.
+    """
+
+    def __init__(self, maxsize=128):
+
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def find_path(self, start_square, end_square, grid, plus_only=False,
+                  heuristic=None, search=find_path):
+        """ Get the path from the cache, running search on a miss. """
+
+        key = (grid.shape, grid.hash, tuple(start_square), tuple(end_square),
+               plus_only, search, getattr(heuristic, "cache_key", heuristic))
+
+        path = self.entries.get(key)
+        if path is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            log.debug("path cache hit", hits=self.hits, misses=self.misses)
+        else:
+            path = tuple(tuple(square) for square in
+                         search(start_square, end_square, grid, plus_only,
+                                heuristic=heuristic))
+            self.entries[key] = path
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+            self.misses += 1
+            log.debug("path cache miss", hits=self.hits, misses=self.misses,
+                      size=len(self.entries))
+
+        return [list(square) for square in path]
+
+    def clear(self):
+        """ Empty the cache (the counters are kept). """
+
+        self.entries.clear()
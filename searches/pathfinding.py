@@ -0,0 +1,400 @@
+#!/usr/bin/env python
+"""A* path finding on a barrier grid
+
+Filename: pathfinding.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+The search code lives here rather than in astar_search.py so that it can be
+used without pygame or a display.
+"""
+
+import heapq
+import math
+from array import array
+
+import numpy as np
+
+from grid import flat_offsets, neighbor_offsets
+
+
+SQRT2 = math.sqrt(2)
+
+
+def manhattan(a, b):
+    """ Manhattan distance, exact on an open grid with plus only moves. """
+
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def chebyshev(a, b):
+    """ Chebyshev distance, exact on an open grid when a diagonal step costs
+    the same as a straight one (which is how find_path counts them). """
+
+    return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+
+
+def octile(a, b):
+    """ Octile distance, exact on an open grid when a diagonal step costs
+    sqrt(2).
+
+    Since find_path counts a diagonal step as 1 this over-estimates whenever a
+    diagonal is needed, which trades a guaranteed shortest path for fewer
+    expanded nodes.
+    """
+
+    dx = abs(a[0] - b[0])
+    dy = abs(a[1] - b[1])
+    return max(dx, dy) + (SQRT2 - 1) * min(dx, dy)
+
+
+HEURISTICS = {
+    "manhattan": manhattan,
+    "chebyshev": chebyshev,
+    "octile": octile,
+}
+
+
+def default_heuristic(plus_only=False):
+    """ Get the admissible heuristic for the given neighbor mode. """
+
+    return manhattan if plus_only is True else chebyshev
+
+
+def _search_arrays(size):
+    """ Preallocate the per-square search state.
+
+    g is the best known distance (-1 if not reached yet), parent is the cell
+    we came from (-1 for none) and closed flags the expanded cells.  Keeping
+    these as flat typed arrays indexed by cell id avoids allocating an object
+    per expanded square.
+    """
+
+    g = array("i", [-1]) * size
+    parent = array("i", [-1]) * size
+    closed = bytearray(size)
+
+    return g, parent, closed
+
+
+def find_path_steps(start_square, end_square, grid, plus_only=False,
+                    stats=None, heuristic=None):
+    """ Find the shortest path from the start square to the end square, a
+    step at a time.
+
+    This is a generator that yields each square as it is expanded, as an
+    (x, y) tuple, and returns the path (see find_path) when it finishes, so
+    the search can be animated a frame at a time.
+
+    Squares are numbered by cell id x*height + y and the search state lives
+    in flat arrays indexed by cell id (see _search_arrays).  The open set is
+    a binary heap of (f, h, cell) tuples, so ties on f go to the smaller h;
+    entries superseded by a cheaper route are skipped when popped since
+    their cell has already been closed.  Neighbors come from the grid's open
+    move mask, so barriers are never searched for.  The returned path runs
+    backwards from the end square and does not include the start square.
+
+    The heuristic defaults to default_heuristic(plus_only).  If a stats dict
+    is given it is filled in with the number of nodes expanded and the peak
+    size of the open set.
+    """
+
+    if heuristic is None:
+        heuristic = default_heuristic(plus_only)
+
+    width, height = grid.shape
+    start = start_square[0]*height + start_square[1]
+    end = end_square[0]*height + end_square[1]
+    end_pos = (end_square[0], end_square[1])
+
+    # open moves for every cell, one byte each
+    moves = grid.cached(("open_moves", plus_only),
+                        lambda: grid.open_moves(plus_only).tobytes())
+    deltas = list(enumerate(flat_offsets(height, plus_only)))
+
+    g, parent, closed = _search_arrays(width*height)
+
+    h = heuristic((start_square[0], start_square[1]), end_pos)
+    open_heap = [(h, h, start)]
+    g[start] = 0
+
+    # Run until we've found the path or have explored all paths
+    found = False
+    expanded = 0
+    peak_open = 1
+    while open_heap:
+
+        if len(open_heap) > peak_open:
+            peak_open = len(open_heap)
+        cell = heapq.heappop(open_heap)[2]
+
+        # Skip entries that have been superseded by a cheaper route
+        if closed[cell]:
+            continue
+
+        # Stop searching when we get to the end
+        if cell == end:
+            found = True
+            break
+
+        closed[cell] = 1
+        expanded += 1
+        yield divmod(cell, height)
+
+        # loop over all the neighbors and update the path information
+        open_bits = moves[cell]
+        neighbor_g = g[cell] + 1
+        for k, delta in deltas:
+
+            if not open_bits >> k & 1:
+                continue
+
+            neighbor = cell + delta
+            if closed[neighbor]:
+                continue
+
+            # only keep the neighbor if it improves on what we already have
+            known_g = g[neighbor]
+            if known_g != -1 and known_g <= neighbor_g:
+                continue
+            g[neighbor] = neighbor_g
+            parent[neighbor] = cell
+
+            h = heuristic(divmod(neighbor, height), end_pos)
+            heapq.heappush(open_heap, (neighbor_g + h, h, neighbor))
+
+    if stats is not None:
+        stats["nodes_expanded"] = expanded
+        stats["peak_open"] = peak_open
+
+    # build the path backwards from finish to start
+    best_path = []
+    if found is True:
+        cell = end
+        while cell != start:
+            best_path.append(list(divmod(cell, height)))
+            cell = parent[cell]
+    return best_path
+
+
+def find_path(start_square, end_square, grid, plus_only=False, stats=None,
+              heuristic=None):
+    """ Find the shortest path from the start square to the end square.
+
+    This runs find_path_steps to the end.  The returned path runs backwards
+    from the end square and does not include the start square; it is empty
+    if the end square cannot be reached.
+    """
+
+    steps = find_path_steps(start_square, end_square, grid, plus_only, stats,
+                            heuristic)
+    try:
+        while True:
+            next(steps)
+    except StopIteration as finished:
+        return finished.value
+
+
+def _jump(free, cell, dx, dy, stride, end, plus_only):
+    """ Jump from cell in direction (dx, dy) to the next jump point.
+
+    free holds the open squares of the grid padded with a closed border, so
+    no bounds checks are needed; cells are numbered x*stride + y on the
+    padded grid.  Returns -1 if we run into a barrier (or off the grid)
+    before finding a jump point.
+    """
+
+    side = dx*stride
+    step = side + dy
+
+    while True:
+        cell += step
+
+        if not free[cell]:
+            return -1
+        if cell == end:
+            return cell
+
+        if plus_only is True:
+            # moving sideways we stop when a barrier behind us opens up
+            if dx != 0:
+                if ((free[cell + 1] and not free[cell - side + 1])
+                        or (free[cell - 1] and not free[cell - side - 1])):
+                    return cell
+
+            # moving up/down we can turn sideways at any square
+            elif (_jump(free, cell, 1, 0, stride, end, plus_only) != -1
+                  or _jump(free, cell, -1, 0, stride, end, plus_only) != -1):
+                return cell
+
+        elif dx != 0 and dy != 0:
+            if ((free[cell - side + dy] and not free[cell - side])
+                    or (free[cell + side - dy] and not free[cell - dy])):
+                return cell
+
+            # the straight jumps are what the diagonal is looking for
+            if (_jump(free, cell, dx, 0, stride, end, plus_only) != -1
+                    or _jump(free, cell, 0, dy, stride, end, plus_only) != -1):
+                return cell
+
+        elif dx != 0:
+            if ((free[cell + side + 1] and not free[cell + 1])
+                    or (free[cell + side - 1] and not free[cell - 1])):
+                return cell
+
+        else:
+            if ((free[cell + stride + dy] and not free[cell + stride])
+                    or (free[cell - stride + dy] and not free[cell - stride])):
+                return cell
+
+
+def _jump_directions(free, cell, dx, dy, stride, plus_only):
+    """ Get the directions left after pruning, arriving at cell moving in
+    direction (dx, dy). """
+
+    if dx == 0 and dy == 0:
+        return [tuple(offset) for offset in neighbor_offsets(plus_only).tolist()]
+
+    side = dx*stride
+
+    if plus_only is True:
+        if dx != 0:
+            return [(dx, 0)] + [(0, s) for s in (1, -1)
+                                if not free[cell - side + s]]
+        return [(0, dy), (1, 0), (-1, 0)]
+
+    if dx != 0 and dy != 0:
+        directions = [(dx, 0), (0, dy), (dx, dy)]
+        if not free[cell - side]:
+            directions.append((-dx, dy))
+        if not free[cell - dy]:
+            directions.append((dx, -dy))
+        return directions
+
+    if dx != 0:
+        return [(dx, 0)] + [(dx, s) for s in (1, -1) if not free[cell + s]]
+    return [(0, dy)] + [(s, dy) for s in (1, -1)
+                        if not free[cell + s*stride]]
+
+
+def _sign(n):
+    return (n > 0) - (n < 0)
+
+
+def jump_point_search(start_square, end_square, grid, plus_only=False,
+                      stats=None, heuristic=None):
+    """ Find the shortest path using Jump Point Search.
+
+    JPS only puts jump points on the open set: from each one it runs along
+    straight (and, with diagonal moves, diagonal) lines until it reaches a
+    square with a forced neighbor, skipping the many equal length paths plain
+    A* would expand.  It relies on every step costing the same, which is how
+    find_path counts them.  With plus only moves up/down runs turn sideways
+    anywhere while sideways runs only turn at forced neighbors.
+
+    The search state uses the same flat arrays as find_path, on the padded
+    grid.  The path is filled back in between jump points, so the result has
+    the same shape as find_path.
+
+    See: D. Harabor and A. Grastien, "Online Graph Pruning for Pathfinding on
+    Grid Maps", AAAI 2011.
+    """
+
+    if heuristic is None:
+        heuristic = default_heuristic(plus_only)
+
+    # work on a grid padded with a closed border, one byte per cell
+    width, height = grid.shape
+    stride = height + 2
+    free = grid.cached("padded_free",
+                       lambda: np.pad(~grid.barriers, 1).tobytes())
+    start = (start_square[0] + 1)*stride + start_square[1] + 1
+    end = (end_square[0] + 1)*stride + end_square[1] + 1
+    end_pos = (end_square[0], end_square[1])
+
+    def h(cell):
+        x, y = divmod(cell, stride)
+        return heuristic((x - 1, y - 1), end_pos)
+
+    g, parent, closed = _search_arrays((width + 2)*stride)
+
+    open_heap = [(h(start), h(start), start)]
+    g[start] = 0
+
+    found = False
+    expanded = 0
+    peak_open = 1
+    while open_heap:
+
+        if len(open_heap) > peak_open:
+            peak_open = len(open_heap)
+        cell = heapq.heappop(open_heap)[2]
+
+        if closed[cell]:
+            continue
+        if cell == end:
+            found = True
+            break
+
+        closed[cell] = 1
+        expanded += 1
+
+        x, y = divmod(cell, stride)
+        if parent[cell] == -1:
+            dx = dy = 0
+        else:
+            parent_x, parent_y = divmod(parent[cell], stride)
+            dx = _sign(x - parent_x)
+            dy = _sign(y - parent_y)
+
+        for jump_dx, jump_dy in _jump_directions(free, cell, dx, dy, stride,
+                                                 plus_only):
+
+            jump_point = _jump(free, cell, jump_dx, jump_dy, stride, end,
+                               plus_only)
+            if jump_point == -1 or closed[jump_point]:
+                continue
+
+            # every jump is a straight or diagonal line
+            jump_x, jump_y = divmod(jump_point, stride)
+            jump_g = g[cell] + max(abs(jump_x - x), abs(jump_y - y))
+
+            known_g = g[jump_point]
+            if known_g != -1 and known_g <= jump_g:
+                continue
+            g[jump_point] = jump_g
+            parent[jump_point] = cell
+
+            jump_h = h(jump_point)
+            heapq.heappush(open_heap, (jump_g + jump_h, jump_h, jump_point))
+
+    if stats is not None:
+        stats["nodes_expanded"] = expanded
+        stats["peak_open"] = peak_open
+
+    if found is False:
+        return []
+
+    # fill in the squares between the jump points, backwards from the end
+    best_path = []
+    cell = end
+    while cell != start:
+        x, y = divmod(cell, stride)
+        parent_x, parent_y = divmod(parent[cell], stride)
+        dx = _sign(parent_x - x)
+        dy = _sign(parent_y - y)
+
+        while (x, y) != (parent_x, parent_y):
+            best_path.append([x - 1, y - 1])
+            x += dx
+            y += dy
+        cell = parent[cell]
+
+    return best_path
+
+
+SEARCHES = {
+    "astar": find_path,
+    "jps": jump_point_search,
+}
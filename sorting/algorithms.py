@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+"""Step by step sorting algorithms
+
+Filename: algorithms.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+Each algorithm is a generator that sorts data in place and yields every
+operation it makes as an (op, a, b) tuple, after making it:
+
+    COMPARE  a, b   data[a] was compared with data[b]
+    SWAP     a, b   data[a] and data[b] were swapped
+    WRITE    a, b   data[a] was set to b
+
+so the visualizer can run them a step at a time, a trace can be recorded
+from the yields and a benchmark can count them.  The one exception is
+merge_sort, which compares a copy of its left run with data[b]: there a is
+where the copied value was before the merge, which may have been written
+over since.
+
+None of them recurse.  The divide and conquer sorts keep their pending
+ranges on an explicit stack inside a single generator, and the helpers
+they share are entered with yield from at a fixed depth, so each step
+costs the same however deep the sort is (the old quicksort went through a
+generator per level for every step, and could hit the recursion limit).
+"""
+
+COMPARE = 0
+SWAP = 1
+WRITE = 2
+
+# Ranges this small are finished off with insertion sort by introsort
+SMALL = 16
+
+# Digit size for the radix sort
+RADIX_BITS = 4
+
+# Ciura's gap sequence for shell sort, extended by 2.25x for big lists
+CIURA_GAPS = [1, 4, 10, 23, 57, 132, 301, 701, 1750]
+
+
+def _insertion(data, lo, hi):
+    """ Insertion sort data[lo:hi + 1] by swapping each value down. """
+
+    for i in range(lo + 1, hi + 1):
+        j = i
+        while j > lo:
+            yield COMPARE, j - 1, j
+            if data[j - 1] <= data[j]:
+                break
+            data[j], data[j - 1] = data[j - 1], data[j]
+            yield SWAP, j - 1, j
+            j -= 1
+
+
+def _heapsort(data, lo, hi):
+    """ Heap sort data[lo:hi + 1] with an iterative sift down. """
+
+    count = hi - lo + 1
+
+    def sift_down(root, end):
+        # children of root are 2*root + 1 and 2*root + 2, counted from lo
+        while 2*root + 1 < end:
+            child = 2*root + 1
+            if child + 1 < end:
+                yield COMPARE, lo + child, lo + child + 1
+                if data[lo + child] < data[lo + child + 1]:
+                    child += 1
+
+            yield COMPARE, lo + root, lo + child
+            if data[lo + root] >= data[lo + child]:
+                return
+
+            a, b = lo + root, lo + child
+            data[a], data[b] = data[b], data[a]
+            yield SWAP, a, b
+            root = child
+
+    for root in range(count // 2 - 1, -1, -1):
+        yield from sift_down(root, count)
+
+    for end in range(count - 1, 0, -1):
+        data[lo], data[lo + end] = data[lo + end], data[lo]
+        yield SWAP, lo, lo + end
+        yield from sift_down(0, end)
+
+
+def _partition(data, lo, hi):
+    """ Lomuto partition of data[lo:hi + 1] around data[hi].
+
+    The pivot's final index is left in the generator's return value.
+    """
+
+    pivot = data[hi]
+    i = lo
+    for j in range(lo, hi):
+        yield COMPARE, j, hi
+        if data[j] < pivot:
+            data[i], data[j] = data[j], data[i]
+            yield SWAP, i, j
+            i += 1
+
+    data[i], data[hi] = data[hi], data[i]
+    yield SWAP, i, hi
+    return i
+
+
+def insertion_sort(data):
+    """ Insertion Sort. """
+
+    yield from _insertion(data, 0, len(data) - 1)
+
+
+def quicksort(data):
+    """ Quick Sort.
+
+    The same Lomuto partition as always, but the ranges left to sort go on
+    a stack rather than into nested generators.  The bigger side is pushed
+    first so the stack stays O(log n) deep.
+    """
+
+    stack = [(0, len(data) - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        if lo >= hi:
+            continue
+
+        p = yield from _partition(data, lo, hi)
+
+        if p - lo > hi - p:
+            stack.append((lo, p - 1))
+            stack.append((p + 1, hi))
+        else:
+            stack.append((p + 1, hi))
+            stack.append((lo, p - 1))
+
+
+def merge_sort(data):
+    """ Bottom up Merge Sort.
+
+    Runs of width 1, 2, 4, ... are merged in turn, so there is nothing to
+    keep on a stack.  The left run is copied out and merged back with the
+    right run in place, so a COMPARE's a is the left value's position in
+    the run before the merge, not where it is now.
+    """
+
+    count = len(data)
+    width = 1
+    while width < count:
+        for lo in range(0, count - width, 2*width):
+            mid = lo + width
+            hi = min(lo + 2*width, count)
+
+            # list() so it's a copy for numpy arrays too
+            left = list(data[lo:mid])
+            i, j, k = 0, mid, lo
+            while i < len(left) and j < hi:
+                # lo + i is where left[i] came from
+                yield COMPARE, lo + i, j
+                if left[i] <= data[j]:
+                    data[k] = left[i]
+                    i += 1
+                else:
+                    data[k] = data[j]
+                    j += 1
+                yield WRITE, k, data[k]
+                k += 1
+
+            # whatever is left of the right run is already in place
+            while i < len(left):
+                data[k] = left[i]
+                yield WRITE, k, data[k]
+                i += 1
+                k += 1
+
+        width *= 2
+
+
+def heap_sort(data):
+    """ Heap Sort. """
+
+    yield from _heapsort(data, 0, len(data) - 1)
+
+
+def shell_sort(data):
+    """ Shell Sort with Ciura's gaps. """
+
+    gaps = list(CIURA_GAPS)
+    while gaps[-1] < len(data):
+        gaps.append(int(gaps[-1]*2.25))
+
+    for gap in reversed(gaps):
+        for i in range(gap, len(data)):
+            j = i
+            while j >= gap:
+                yield COMPARE, j - gap, j
+                if data[j - gap] <= data[j]:
+                    break
+                data[j], data[j - gap] = data[j - gap], data[j]
+                yield SWAP, j - gap, j
+                j -= gap
+
+
+def introsort(data):
+    """ Introsort: quick sort with a median of three pivot, falling back to
+    heap sort for ranges that recurse too deep and finishing small ranges
+    with insertion sort. """
+
+    count = len(data)
+    stack = [(0, count - 1, 2*count.bit_length())]
+    while stack:
+        lo, hi, depth = stack.pop()
+
+        if hi - lo < SMALL:
+            yield from _insertion(data, lo, hi)
+            continue
+
+        if depth == 0:
+            yield from _heapsort(data, lo, hi)
+            continue
+
+        # move the median of lo, mid and hi to hi to be the pivot
+        mid = (lo + hi) // 2
+        for a, b in ((lo, mid), (mid, hi), (lo, mid)):
+            yield COMPARE, a, b
+            if data[b] < data[a]:
+                data[a], data[b] = data[b], data[a]
+                yield SWAP, a, b
+        data[mid], data[hi] = data[hi], data[mid]
+        yield SWAP, mid, hi
+
+        p = yield from _partition(data, lo, hi)
+
+        if p - lo > hi - p:
+            stack.append((lo, p - 1, depth - 1))
+            stack.append((p + 1, hi, depth - 1))
+        else:
+            stack.append((p + 1, hi, depth - 1))
+            stack.append((lo, p - 1, depth - 1))
+
+
+def radix_sort(data):
+    """ LSD Radix Sort on non-negative integers, RADIX_BITS at a time.
+
+    Each pass is a stable counting sort on one digit; working out where
+    everything goes only reads, so the steps are the writes back.
+    """
+
+    if any(value < 0 for value in data):
+        raise ValueError("radix sort only sorts non-negative integers")
+
+    radix = 1 << RADIX_BITS
+    mask = radix - 1
+    shift = 0
+    largest = max(data, default=0)
+
+    while largest >> shift:
+        buckets = [[] for _ in range(radix)]
+        for value in data:
+            buckets[(value >> shift) & mask].append(value)
+
+        k = 0
+        for bucket in buckets:
+            for value in bucket:
+                data[k] = value
+                yield WRITE, k, value
+                k += 1
+
+        shift += RADIX_BITS
+
+
+ALGORITHMS = {
+    "insertion": insertion_sort,
+    "quick": quicksort,
+    "merge": merge_sort,
+    "heap": heap_sort,
+    "shell": shell_sort,
+    "intro": introsort,
+    "radix": radix_sort,
+}
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""Headless benchmark for the sorts
+
+Filename: benchmark.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+Runs the sorts in algorithms.py over several sizes and input distributions
+without opening a window and reports, for each run, the comparisons, swaps
+and writes made, the number of steps, the wall time and the time per step,
+along with the time the built in sorted() takes on the same input.  Each run
+stops after --max-steps steps, so the O(n^2) cases (insertion sort, or the
+Lomuto quick sort on sorted and reversed input) report how far they got
+rather than running for hours.
+
+    python benchmark.py -s 1000 -s 100000 -a quick -a intro -f csv
+"""
+
+import click
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+from common.results import write_results
+
+from algorithms import ALGORITHMS, COMPARE, SWAP, WRITE
+
+FIELDS = ["algorithm", "distribution", "size", "seed", "comparisons",
+          "swaps", "writes", "steps", "complete", "wall_time", "step_time",
+          "builtin_time"]
+
+
+def make_input(distribution, size, seed=0):
+    """ Make a list of size non-negative integers with the distribution. """
+
+    rng = random.Random(seed)
+
+    if distribution == "random":
+        data = list(range(size))
+        rng.shuffle(data)
+    elif distribution == "sorted":
+        data = list(range(size))
+    elif distribution == "reversed":
+        data = list(range(size - 1, -1, -1))
+    elif distribution == "few-unique":
+        data = [rng.randrange(10) for _ in range(size)]
+    elif distribution == "organ-pipe":
+        data = [min(i, size - 1 - i) for i in range(size)]
+    elif distribution == "nearly-sorted":
+        # about 1% of the values swapped with a random other one (at least
+        # one, once there are two to swap)
+        data = list(range(size))
+        for _ in range(max(1, size // 100) if size > 1 else 0):
+            i, j = rng.randrange(size), rng.randrange(size)
+            data[i], data[j] = data[j], data[i]
+    else:
+        raise ValueError(f"Unknown distribution {distribution}")
+
+    return data
+
+
+DISTRIBUTIONS = ["random", "sorted", "reversed", "few-unique", "organ-pipe",
+                 "nearly-sorted"]
+
+
+def run_benchmark(algorithm, distribution, size, seed=0, max_steps=None):
+    """ Run a single sort, counting the operations it yields.
+
+    The wall time includes stepping through the generator the way the
+    visualizer does, so step_time is the cost of a single step.  complete
+    is False when the sort was stopped at max_steps.
+    """
+
+    data = make_input(distribution, size, seed)
+
+    start_time = time.perf_counter()
+    sorted(data)
+    builtin_time = time.perf_counter() - start_time
+
+    counts = [0, 0, 0]
+    steps = 0
+    complete = True
+
+    start_time = time.perf_counter()
+    for op, a, b in ALGORITHMS[algorithm](data):
+        counts[op] += 1
+        steps += 1
+        if steps == max_steps:
+            complete = False
+            break
+    wall_time = time.perf_counter() - start_time
+
+    return {"algorithm": algorithm,
+            "distribution": distribution,
+            "size": size,
+            "seed": seed,
+            "comparisons": counts[COMPARE],
+            "swaps": counts[SWAP],
+            "writes": counts[WRITE],
+            "steps": steps,
+            "complete": complete,
+            "wall_time": wall_time,
+            "step_time": wall_time / steps if steps else 0,
+            "builtin_time": builtin_time}
+
+
+@click.command()
+@click.option("-s", "--size", "sizes", type=click.IntRange(min=1),
+              multiple=True, default=[100, 1000, 10000, 100000, 1000000],
+              help="Number of values (repeatable)")
+@click.option("-a", "--algorithm", "algorithms", multiple=True,
+              type=click.Choice(sorted(ALGORITHMS)),
+              default=sorted(ALGORITHMS), help="Sort (repeatable)")
+@click.option("-d", "--distribution", "distributions", multiple=True,
+              type=click.Choice(DISTRIBUTIONS), default=DISTRIBUTIONS,
+              help="Input distribution (repeatable)")
+@click.option("--max-steps", type=int, default=10_000_000,
+              help="Stop a sort after this many steps (0 for no limit)")
+@click.option("--seed", type=int, default=0, help="Random seed")
+@click.option("-f", "--format", "fmt", type=click.Choice(["json", "csv"]),
+              default="json", help="Output format")
+@click.option("-o", "--output", type=click.File("w"), default="-",
+              help="Output file (default stdout)")
+def main(sizes, algorithms, distributions, max_steps, seed, fmt, output):
+
+    results = []
+    for size in sizes:
+        for distribution in distributions:
+            for algorithm in algorithms:
+                result = run_benchmark(algorithm, distribution, size, seed,
+                                       max_steps or None)
+                print(f"{algorithm} size={size} distribution={distribution} "
+                      f"steps={result['steps']} "
+                      f"complete={result['complete']} "
+                      f"time={result['wall_time']:.3f}s", file=sys.stderr)
+                results.append(result)
+
+    write_results(results, output, fmt, FIELDS)
+
+
+if __name__ == "__main__":
+    main()
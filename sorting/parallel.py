@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+"""Parallel sorts over a shared memory array
+
+Filename: parallel.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+Worker processes sort an int array in shared memory in place, so the
+visualizer can draw from the same buffer while they work and color each
+value by the worker that last touched it.
+
+    merge    each worker sorts one run, then neighboring runs are merged in
+             pairs, round by round, with half as many workers busy each
+             round as the one before
+    bitonic  a bitonic sorting network, with each stage's compare-exchanges
+             split evenly between the workers (the array is padded to a
+             power of two)
+
+With a kernel from algorithms.py the workers do the work a step at a time
+in Python, slowly enough to watch; without one they use numpy, which is
+where the speedup on big arrays comes from.  The kernel sorts the runs of
+the merge sort; bitonic has no runs to sort, so any kernel just does its
+compare-exchanges in Python (the command line only takes one for merge):
+
+    python parallel.py -n 10000000 -w 8 -m merge
+"""
+
+import click
+import numpy as np
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import Value
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+from common.shared import SharedArray, attach
+
+from algorithms import ALGORITHMS
+
+METHODS = ("merge", "bitonic")
+
+# Fills out the bitonic network's power of two, after every real value
+PAD = np.iinfo(np.int32).max
+
+# Owner of a value no worker has touched yet
+UNOWNED = -1
+
+# Worker numbers, wide enough for far more workers than there are colors
+OWNER_DTYPE = np.int16
+
+# A worker process's number, the arrays it sorts and its kernel
+_worker = {}
+
+
+def _init_worker(values, owners, counter, kernel):
+    """ Map the shared values and owners into the worker and give it the
+    next worker number. """
+
+    with counter.get_lock():
+        _worker["number"] = counter.value
+        counter.value += 1
+
+    _worker["values"] = attach(values)
+    _worker["owners"] = attach(owners)
+    _worker["kernel"] = kernel
+
+
+def _sort_run(lo, hi):
+    """ Sort values[lo:hi] in place. """
+
+    values = _worker["values"]
+    _worker["owners"][lo:hi] = _worker["number"]
+
+    if _worker["kernel"] is None:
+        values[lo:hi].sort()
+    else:
+        for _ in ALGORITHMS[_worker["kernel"]](values[lo:hi]):
+            pass
+
+
+def _merge_runs(lo, mid, hi):
+    """ Merge the sorted runs values[lo:mid] and values[mid:hi] in place. """
+
+    values = _worker["values"]
+    _worker["owners"][lo:hi] = _worker["number"]
+
+    if _worker["kernel"] is None:
+        # timsort finds the two runs, so this is a linear merge
+        values[lo:hi] = np.sort(values[lo:hi], kind="stable")
+        return
+
+    # the left run is copied out and merged back with the right run
+    left = values[lo:mid].tolist()
+    i, j, k = 0, mid, lo
+    while i < len(left) and j < hi:
+        if left[i] <= values[j]:
+            values[k] = left[i]
+            i += 1
+        else:
+            values[k] = values[j]
+            j += 1
+        k += 1
+    values[k:k + len(left) - i] = left[i:]
+
+
+def _bitonic_stage(k, j, blocks, columns):
+    """ Make a rectangle of the compare-exchanges of a bitonic network stage.
+
+    The stage pairs each i with bit j clear with i + j.  Seen as blocks of
+    2*j values, block b pairs values[b*2*j + c] with the value j after it
+    for each column c < j, in ascending order when bit k of b*2*j is clear
+    and descending order when it is set (so the same way for the whole
+    block).  blocks and columns are the (start, stop) ranges to do.
+    """
+
+    shape = (-1, 2, j)
+    values = _worker["values"].reshape(shape)[slice(*blocks), :,
+                                              slice(*columns)]
+    _worker["owners"].reshape(shape)[slice(*blocks), :,
+                                     slice(*columns)] = _worker["number"]
+
+    ascending = (np.arange(*blocks)*2*j & k) == 0
+    if _worker["kernel"] is None:
+        a = values[:, 0]
+        b = values[:, 1]
+        low = np.minimum(a, b)
+        high = np.maximum(a, b)
+        ascending = ascending[:, None]
+        a[:] = np.where(ascending, low, high)
+        b[:] = np.where(ascending, high, low)
+        return
+
+    for block, up in zip(values, ascending.tolist()):
+        a, b = block
+        for c in range(len(a)):
+            if (a[c] > b[c]) == up:
+                a[c], b[c] = b[c], a[c]
+
+
+class ParallelSort:
+    """ Sorts data in shared memory across a process pool.
+
+    values is a numpy array over the shared memory and owners has, for each
+    value, the number of the worker that last touched it (UNOWNED before
+    any has).  Both can be read at any time, e.g. once a frame, while the
+    workers write to them; views of them must be dropped before close().
+    """
+
+    def __init__(self, data, workers=None, kernel=None):
+
+        self.size = len(data)
+        self.workers = workers or os.cpu_count()
+        self.done = True
+
+        padded = 1 << max(0, self.size - 1).bit_length()
+        values = SharedArray(padded, np.int32)
+        owners = SharedArray(padded, OWNER_DTYPE)
+        self._shared = (values, owners)
+        self._values = values.array
+        self._owners = owners.array
+        self.values = self._values[:self.size]
+        self.owners = self._owners[:self.size]
+
+        self._rounds = None
+        self._pending = None
+        self.load(data)
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker,
+            initargs=(values.spec, owners.spec, Value("i", 0), kernel))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _merge_rounds(self):
+        """ Yield the futures of each round of the parallel merge sort. """
+
+        bounds = [self.size*n // self.workers for n in range(self.workers + 1)]
+        yield [self._pool.submit(_sort_run, lo, hi)
+               for lo, hi in zip(bounds, bounds[1:])]
+
+        while len(bounds) > 2:
+            yield [self._pool.submit(_merge_runs, *bounds[n:n + 3])
+                   for n in range(0, len(bounds) - 2, 2)]
+
+            # an odd run out waits for the next round
+            bounds = bounds[::2] + ([bounds[-1]] if len(bounds) % 2 == 0
+                                    else [])
+
+    def _bitonic_rounds(self):
+        """ Yield the futures of each stage of the bitonic network. """
+
+        padded = len(self._values)
+        k = 2
+        while k <= padded:
+            j = k // 2
+            while j > 0:
+                # split whichever of the blocks and columns there are more of
+                count = padded // (2*j)
+                split = max(count, j)
+                bounds = [split*n // self.workers
+                          for n in range(self.workers + 1)]
+                ranges = [(lo, hi) for lo, hi in zip(bounds, bounds[1:])
+                          if lo < hi]
+                if count >= j:
+                    tasks = [(k, j, r, (0, j)) for r in ranges]
+                else:
+                    tasks = [(k, j, (0, count), r) for r in ranges]
+
+                yield [self._pool.submit(_bitonic_stage, *task)
+                       for task in tasks]
+                j //= 2
+            k *= 2
+
+    def stop(self):
+        """ Stop the sort running once its current round is done. """
+
+        if self._pending is not None:
+            wait(self._pending)
+        self._rounds = None
+        self._pending = None
+        self.done = True
+
+    def load(self, data):
+        """ Copy data into the shared memory, stopping the sort running. """
+
+        self.stop()
+        self._values[:self.size] = data
+        self._values[self.size:] = PAD
+        self._owners[:] = UNOWNED
+
+    def start(self, method):
+        """ Start sorting with method (stopping the sort running). """
+
+        self.stop()
+        rounds = {"merge": self._merge_rounds,
+                  "bitonic": self._bitonic_rounds}[method]()
+        self._rounds = rounds
+        self._pending = next(rounds, None)
+        self.done = self._pending is None
+
+    def advance(self, timeout=None):
+        """ Wait up to timeout seconds (None for as long as it takes) on the
+        sort, starting each round as soon as the one before is done. """
+
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self._pending is not None:
+            remaining = (None if deadline is None
+                         else max(0, deadline - time.perf_counter()))
+            finished, waiting = wait(self._pending, remaining)
+            if waiting:
+                return
+
+            for future in finished:
+                future.result()
+            self._pending = next(self._rounds, None)
+
+        self.done = True
+
+    def sort(self, method):
+        """ Run a whole sort. """
+
+        self.start(method)
+        self.advance()
+
+    def close(self):
+        """ Shut down the workers and free the shared memory. """
+
+        self._pool.shutdown(cancel_futures=True)
+        self.values = self.owners = self._values = self._owners = None
+        for shared in self._shared:
+            shared.close()
+
+
+@click.command()
+@click.option("-n", "--size", type=int, default=10_000_000,
+              help="Number of values to sort")
+@click.option("-m", "--method", type=click.Choice(METHODS), default="merge",
+              help="Parallel sort")
+@click.option("-w", "--workers", type=int, default=os.cpu_count(),
+              help="Number of worker processes")
+@click.option("-k", "--kernel", type=click.Choice(sorted(ALGORITHMS)),
+              default=None, help="Sort the merge runs a step at a time in "
+                                 "Python with this (default numpy)")
+@click.option("--seed", type=int, default=0, help="Random seed")
+def main(size, method, workers, kernel, seed):
+    """ Time a parallel sort against numpy's sort on one core. """
+
+    if method == "bitonic" and kernel is not None:
+        raise click.UsageError("--kernel picks the sort for the runs of the "
+                               "merge method, bitonic has none")
+
+    data = np.random.default_rng(seed).permutation(size).astype(np.int32)
+
+    start_time = time.perf_counter()
+    expected = np.sort(data)
+    numpy_time = time.perf_counter() - start_time
+
+    with ParallelSort(data, workers, kernel) as sorter:
+        start_time = time.perf_counter()
+        sorter.sort(method)
+        wall_time = time.perf_counter() - start_time
+        correct = bool((sorter.values == expected).all())
+
+    print(f"{method} size={size} workers={workers} "
+          f"kernel={kernel or 'numpy'} time={wall_time:.3f}s "
+          f"numpy={numpy_time:.3f}s speedup={numpy_time / wall_time:.2f} "
+          f"correct={correct}", file=sys.stderr)
+    if not correct:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""Operation traces for the sort visualizer
+
+Filename: sort_trace.py
+Author: James Casey
+Date Created: 2026-10-17
+Last Updated: 2026-10-17
+
+Rather than stepping a sort one operation per frame, the sort can be run
+to the end at full speed with every operation it yields written into a
+Trace.  A Replay then plays the trace back onto a list at any speed,
+forwards or backwards.
+
+A trace is a flat array('i') of the (op, a, b) triples the sorts yield
+(see algorithms.py).
+
+Every checkpoint_every operations the trace keeps a copy of the data, so a
+seek only replays at most checkpoint_every operations from the checkpoint
+before it.
+"""
+
+from array import array
+
+from algorithms import SWAP, WRITE
+
+
+class Trace:
+    """ The operations a sort made, plus periodic checkpoints. """
+
+    def __init__(self, initial, checkpoint_every=None):
+
+        if checkpoint_every is None:
+            # keeps the checkpoints about the same size as the trace
+            checkpoint_every = max(4096, len(initial))
+
+        self.initial = array("i", initial)
+        self.ops = array("i")
+        self.checkpoint_every = checkpoint_every
+        self.checkpoints = [self.initial]
+
+    def __len__(self):
+        return len(self.ops) // 3
+
+    def op(self, number):
+        """ Get operation number as an (op, a, b) tuple. """
+
+        return tuple(self.ops[number*3:number*3 + 3])
+
+    def append(self, op, a, b, data):
+        """ Add an operation, checkpointing data (the list after the
+        operation) when one is due. """
+
+        self.ops.extend((op, a, b))
+        if len(self) % self.checkpoint_every == 0:
+            self.checkpoints.append(array("i", data))
+
+
+def record(sort, data, checkpoint_every=None):
+    """ Run a sort (see algorithms.py) on a copy of data to the end and get
+    the trace of the operations it yields. """
+
+    data = list(data)
+    trace = Trace(data, checkpoint_every)
+    for op, a, b in sort(data):
+        trace.append(op, a, b, data)
+
+    return trace
+
+
+class Replay:
+    """ Plays a trace back onto data (a list, e.g. a TrackedList).
+
+    position is the number of operations applied.  highlight holds the
+    indices the last operation applied looked at.
+    """
+
+    def __init__(self, trace, data):
+
+        self.trace = trace
+        self.data = data
+        self.position = 0
+        self.highlight = ()
+        self.data[:] = trace.initial
+
+    def __len__(self):
+        return len(self.trace)
+
+    def _apply(self, start, stop):
+        """ Apply operations start up to stop to the data. """
+
+        data = self.data
+        ops = self.trace.ops
+        for k in range(start*3, stop*3, 3):
+            op, a, b = ops[k], ops[k + 1], ops[k + 2]
+            if op == SWAP:
+                data[a], data[b] = data[b], data[a]
+            elif op == WRITE:
+                data[a] = b
+
+        if stop > start:
+            op, a, b = self.trace.op(stop - 1)
+            self.highlight = (a,) if op == WRITE else (a, b)
+
+    def seek(self, position):
+        """ Move to position, going back to a checkpoint if needed. """
+
+        position = max(0, min(position, len(self.trace)))
+        if position < self.position:
+            every = self.trace.checkpoint_every
+            checkpoint = position // every
+            self.data[:] = self.trace.checkpoints[checkpoint]
+            self.position = checkpoint*every
+            self.highlight = ()
+
+        elif position - self.position > self.trace.checkpoint_every:
+            # jumping far ahead is quicker from the nearest checkpoint
+            every = self.trace.checkpoint_every
+            checkpoint = position // every
+            self.data[:] = self.trace.checkpoints[checkpoint]
+            self.position = checkpoint*every
+
+        self._apply(self.position, position)
+        self.position = position
+
+    def step(self, count=1):
+        """ Move count operations forwards (or backwards if negative). """
+
+        self.seek(self.position + count)
+
+    def done(self):
+        return self.position >= len(self.trace)
+
+    def play(self):
+        """ Step forwards an operation at a time, yielding the position, so
+        a FrameScheduler can run the replay.  Seeking in between is fine,
+        playing carries on from wherever the replay got to. """
+
+        while not self.done():
+            self.step()
+            yield self.position
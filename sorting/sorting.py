@@ -17,11 +17,27 @@ import click
 import logging
 import structlog
 from structlog.stdlib import LoggerFactory
+import numpy as np
+import os
+# pygame says hello on stdout, which would end up in a --record - stream
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
 import pygame
 import random
+import sys
+import time
 from enum import Enum
 from pdb import set_trace
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+from common.grid import grid_options
+from common.recorder import FrameRecorder, use_dummy_driver
+from common.scheduler import FrameScheduler
+
+from algorithms import ALGORITHMS
+from parallel import METHODS, ParallelSort
+from sort_trace import Replay, record
+
 structlog.configure(logger_factory=LoggerFactory())
 log = structlog.get_logger()
 
@@ -39,73 +55,158 @@ BLUE = (0, 0, 255)
 CYAN = (0, 255, 255)
 YELLOW = (255,255,0)
 
-WIDTH=800
-HEIGHT=800
-SQUARE_SIZE = 10
-MAX_X = int(WIDTH / SQUARE_SIZE) - 1
-MAX_Y = int(HEIGHT / SQUARE_SIZE) - 1
+# Bar colors for the workers of a parallel sort, then for untouched values
+WORKER_COLORS = np.array([(255, 99, 71), (255, 165, 0), (154, 205, 50),
+                          (64, 224, 208), (100, 149, 237), (186, 85, 211),
+                          (255, 105, 180), (210, 180, 140), CYAN],
+                         dtype=np.uint8)
 
 
-def quicksort(data, lo, hi):
-    """ Quick Sort.
+class TrackedList(list):
+    """ A list that remembers which indices were written to, so the bars
+    for them can be redrawn. """
 
-    In order to visualize the sorting, we have to do some weird stuff with
-    yeilding....
-    """
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.touched = set(range(len(self)))
 
-    if lo < hi:
-        p = partition(data, lo, hi)
-
-        stat = None
-        while stat is None:
-            stat = p.__next__()
-            yield True
-        p = stat
-
-        c1 = quicksort(data, lo, p-1)
-        c2 = quicksort(data, p+1, hi)
-
-        stat = True
-        while stat:
-            stat = c1.__next__()
-            yield True
-
-        stat = True
-        while stat:
-            stat = c2.__next__()
-            yield True
-    yield False
-
-def partition(data, lo, hi):
-    """ Partitioning for Quick Sort.  """
-    pivot = data[hi]
-    i = lo
-    for j in range(lo, hi):
-        if data[j] < pivot:
-            data[i], data[j] = data[j], data[i]
-            i += 1
-            yield None
-    data[i], data[hi] = data[hi], data[i]
-    yield i
-
-
-def insertion_sort(data):
-    """ Insertion Sort.
-
-    In order to visualize the sorting, we have to do some weird stuff with
-    yeilding....
-    """
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        if isinstance(index, slice):
+            self.touched.update(range(*index.indices(len(self))))
+        else:
+            self.touched.add(index % len(self))
 
-    i = 0
-    while i < len(data):
-        j = i
-        while j > 0 and data[j-1] > data[j]:
-            data[j],data[j-1] = data[j-1],data[j]
-            j -= 1
-            yield True
-        i += 1
 
-    yield False
+class BarRenderer:
+    """ Draw the data as bars, repainting only the bars that changed.
+
+    Bars are written straight into the display's pixels with numpy, all the
+    touched bars in one go, and draw() returns the rects to pass to
+    pygame.display.update().  While the data fits on the grid each bar looks
+    the same as the old stack of squares; past that each bar is one pixel
+    column and when there are more bars than columns a column shows the
+    first bar that lands on it.
+    """
+
+    def __init__(self, surface, geometry, data, max_value, draw_grid=False):
+
+        self.surface = surface
+        self.geometry = geometry
+        self.data = data
+        width, height = surface.get_size()
+        self.height = height
+
+        size = geometry.square_size
+        count = len(data)
+        self.squares = (count*size <= width
+                        and (max_value + 1)*size <= height)
+
+        background = pygame.Surface(surface.get_size())
+        background.fill(BLACK)
+        rows = np.arange(height)
+
+        if self.squares:
+            self.pitch = size
+            self.columns = count
+
+            # gaps between the squares of a bar stay background
+            self.bar = ((np.arange(size)[:, None] > 0)
+                        & (rows % size > 0) & (rows < geometry.max_y*size))
+
+            if draw_grid is True:
+                background = geometry.lines(BLACK, WHITE)
+        else:
+            self.pitch = 1
+            self.columns = min(count, width)
+            self.bar = np.ones((1, height), dtype=bool)
+            self.unit = height / max_value
+
+        # the bar shown in each column
+        self.shown = np.arange(self.columns)*count // self.columns
+        self.background = pygame.surfarray.array3d(background)
+        self.rows = rows
+        self.highlighted = set()
+        self.shared = None
+
+    def highlight(self, indices):
+        """ Draw the bars at indices in a different color (and the ones
+        highlighted before in the usual one). """
+
+        indices = set(indices)
+        self.data.touched.update(self.highlighted ^ indices)
+        self.highlighted = indices
+
+    def _tops(self, values):
+        """ Get the first pixel row of bars with the given values. """
+
+        if self.squares:
+            size = self.geometry.square_size
+            return (self.geometry.max_y - values + 1)*size
+        return self.height - np.rint(values*self.unit).astype(int)
+
+    def draw(self):
+        """ Repaint the bars touched since the last draw. """
+
+        if not self.data.touched:
+            return []
+
+        touched = np.zeros(len(self.data), dtype=bool)
+        touched[list(self.data.touched)] = True
+        self.data.touched.clear()
+
+        columns = np.flatnonzero(touched[self.shown])
+        if not columns.size:
+            return []
+
+        values = np.array([self.data[i] for i in self.shown[columns].tolist()])
+        colors = np.full((len(columns), 3), CYAN, dtype=np.uint8)
+        if self.highlighted:
+            marked = np.isin(self.shown[columns], list(self.highlighted))
+            colors[marked] = YELLOW
+
+        return self._paint(columns, values, colors)
+
+    def draw_shared(self, values, owners):
+        """ Repaint the bars whose value or owner changed, reading them from
+        numpy arrays that other processes are writing to, with each bar in
+        its owner's color. """
+
+        values = values[self.shown]
+        owners = owners[self.shown]
+        if self.shared is None:
+            columns = np.arange(self.columns)
+        else:
+            columns = np.flatnonzero((values != self.shared[0])
+                                     | (owners != self.shared[1]))
+        self.shared = (values, owners)
+        if not columns.size:
+            return []
+
+        # the last color is for values no worker has touched yet
+        owners = owners[columns].astype(int)
+        colors = WORKER_COLORS[np.where(owners < 0, len(WORKER_COLORS) - 1,
+                                        owners % (len(WORKER_COLORS) - 1))]
+        return self._paint(columns, values[columns], colors)
+
+    def _paint(self, columns, values, colors):
+        """ Paint the bars in columns with values and colors, returning the
+        rects painted. """
+
+        xs = columns[:, None]*self.pitch + np.arange(self.pitch)
+
+        filled = self.rows >= self._tops(values)[:, None]
+        filled = filled[:, None, :] & self.bar
+
+        pixels = pygame.surfarray.pixels3d(self.surface)
+        pixels[xs] = np.where(filled[..., None], colors[:, None, None],
+                              self.background[xs])
+        del pixels
+
+        # one rect per run of neighboring columns
+        runs = np.split(columns, np.flatnonzero(np.diff(columns) > 1) + 1)
+        return [pygame.Rect(int(run[0])*self.pitch, 0,
+                            len(run)*self.pitch, self.height) for run in runs]
 
 
 @click.command()
@@ -117,32 +218,104 @@ def insertion_sort(data):
                 help="Run Insertion Sort (Default)")
 @click.option("-q", "--quick", is_flag=True, default=False,
                 help="Run Quick Sort")
-def main(verbose, draw_grid, insertion, quick):
+@click.option("-a", "--algorithm", type=click.Choice(sorted(ALGORITHMS)),
+                default=None, help="Sort to run (overrides -i/-q)")
+@click.option("-n", "--size", type=int, default=None,
+                help="Number of values to sort (default fills the grid)")
+@click.option("--rate", type=float, default=30,
+                help="Sort steps per second (0 for as fast as possible)")
+@click.option("--speed", type=float, default=1.0,
+                help="Multiplier on --rate, also changed with up/down")
+@click.option("--budget", type=float, default=12,
+                help="Most milliseconds of sorting per frame")
+@click.option("--fps", type=int, default=30, help="Frames per second")
+@click.option("-r", "--replay", is_flag=True, default=False,
+                help="Record the whole sort first, then play it back "
+                     "(left/right seek, home/end jump)")
+@click.option("-p", "--parallel", type=click.Choice(METHODS), default=None,
+                help="Sort in parallel across worker processes, with each "
+                     "worker's bars in its own color (with merge, -a sorts "
+                     "each run a step at a time)")
+@click.option("-w", "--workers", type=int, default=os.cpu_count(),
+                help="Number of worker processes for --parallel")
+@click.option("--record", "record_path", type=str, default=None,
+                help="Sort straight away without a window, writing the "
+                     "frames to a PNG pattern/directory or raw RGB "
+                     "(.rgb or - for stdout)")
+@grid_options(800, 800, 10)
+def main(verbose, draw_grid, insertion, quick, algorithm, size, rate, speed,
+         budget, fps, replay, parallel, workers, record_path, geometry):
 
     if verbose is True:
         logging.basicConfig(level=logging.DEBUG)
     else:
         logging.basicConfig(level=logging.WARNING)
 
+    # the bitonic network is the same compare-exchanges whatever the sort
+    if parallel == "bitonic" and algorithm is not None:
+        raise click.UsageError("-a picks the sort for the runs of "
+                               "--parallel merge, bitonic has none")
+
     # initialization/setup
+    if record_path is not None:
+        use_dummy_driver()
     pygame.init()
     pygame.font.init()
 
-    gDisplay = pygame.display.set_mode((WIDTH,HEIGHT))
+    gDisplay = pygame.display.set_mode(geometry.size)
     clock = pygame.time.Clock()
 
+    # Recordings are drawn offscreen, as fast as they can be
+    recorder = None
+    if record_path is not None:
+        recorder = FrameRecorder(record_path, fps)
+        gDisplay = pygame.Surface(geometry.size)
+
     # Generate a list of data and randomize it
-    data = list(range(1,MAX_X))
+    if size is None:
+        size = geometry.max_x - 1
+    data = TrackedList(range(1,size + 1))
     random.shuffle(data)
 
+    renderer = BarRenderer(gDisplay, geometry, data, size, draw_grid)
+    gDisplay.blit(pygame.surfarray.make_surface(renderer.background), (0, 0))
+    renderer.draw()
+    pygame.display.update()
 
-    # set the sort function
-    if quick is True:
-        corou = quicksort(data, 0, len(data)-1)
-    else:
-        corou = insertion_sort(data)
+    # The workers sort a copy of data in shared memory, which gets drawn
+    # straight from there
+    sorter = None
+    if parallel is not None:
+        sorter = ParallelSort(data, workers, kernel=algorithm)
+        pygame.display.set_caption(f"{parallel} sort on {workers} workers")
 
-    sorting = False
+    # set the sort function
+    if algorithm is None:
+        algorithm = "quick" if quick is True else "insertion"
+    sort = ALGORITHMS[algorithm]
+
+    def new_sort():
+        if replay is True:
+            start_time = time.perf_counter()
+            trace = record(sort, data)
+            info("Recorded sort", ops=len(trace),
+                 seconds=round(time.perf_counter() - start_time, 3))
+            return Replay(trace, data)
+
+        return sort(data)
+
+    corou = new_sort()
+    steps = corou.play() if replay is True else corou
+
+    # The scheduler decides how many steps fit in each frame
+    # (recordings go by the time in the recording)
+    now = time.perf_counter if recorder is None else recorder.time
+    scheduler = FrameScheduler(budget, rate, speed, clock=now)
+
+    # a recording starts sorting straight away and stops when it's sorted
+    sorting = recorder is not None
+    if sorting is True and sorter is not None:
+        sorter.start(parallel)
     running = True
     while running:
 
@@ -154,40 +327,69 @@ def main(verbose, draw_grid, insertion, quick):
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if pygame.mouse.get_pressed() == (1,0,0):
                     sorting = False if sorting else True
+                    if sorting is True and sorter is not None and sorter.done:
+                        sorter.start(parallel)
                 elif pygame.mouse.get_pressed() == (0,0,1):
                     random.shuffle(data)
-                    if quick is True:
-                        corou = quicksort(data, 0, len(data)-1)
-                    else:
-                        corou = insertion_sort(data)
-
-        gDisplay.fill(BLACK)
-
-        # Draw the grid
-        if draw_grid is True:
-
-            for i in range(1,int(WIDTH/SQUARE_SIZE)):
-                x = SQUARE_SIZE*i
-                pygame.draw.line(gDisplay, WHITE, (x,0), (x,HEIGHT),1)
-
-            for i in range(1,int(HEIGHT/SQUARE_SIZE)):
-                y = SQUARE_SIZE*i
-                pygame.draw.line(gDisplay, WHITE, (0,y), (WIDTH,y),1)
+                    corou = new_sort()
+                    steps = corou.play() if replay is True else corou
+                    if sorter is not None:
+                        sorter.load(data)
+                        if sorting is True:
+                            sorter.start(parallel)
+
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_UP:
+                    scheduler.faster()
+                elif event.key == pygame.K_DOWN:
+                    scheduler.slower()
+
+            # seeking only makes sense for a replay, by about a second
+            if event.type == pygame.KEYDOWN and replay is True:
+                jump = max(1, int(scheduler.target_rate
+                                  or scheduler.steps_per_second))
+                if event.key == pygame.K_RIGHT:
+                    corou.step(jump)
+                elif event.key == pygame.K_LEFT:
+                    corou.step(-jump)
+                    steps = corou.play()
+                elif event.key == pygame.K_HOME:
+                    corou.seek(0)
+                    steps = corou.play()
+                elif event.key == pygame.K_END:
+                    corou.seek(len(corou))
 
         # Don't run unless we've clicked to run
-        if sorting is True:
-            sorting = corou.__next__()
-
-        # Draw the data
-        for i, value in enumerate(data):
-            for j in range(1,value):
-                x = i*SQUARE_SIZE + 1
-                y = (MAX_Y - j)*SQUARE_SIZE + 1
-                pygame.draw.rect(gDisplay, CYAN,
-                        pygame.Rect(x,y,SQUARE_SIZE - 1, SQUARE_SIZE - 1))
-
-        pygame.display.update()
-        clock.tick(30)
+        if sorting is True and sorter is not None:
+            # the workers run on their own, this starts their next rounds
+            sorter.advance(budget / 1000)
+            sorting = not sorter.done
+        elif sorting is True:
+            scheduler.advance(steps)
+            sorting = not scheduler.done
+            pygame.display.set_caption(
+                f"{algorithm} {scheduler.steps_per_second:.0f} steps/s")
+        if replay is True:
+            renderer.highlight(corou.highlight)
+
+        # Draw the bars that changed
+        if sorter is not None:
+            rects = renderer.draw_shared(sorter.values, sorter.owners)
+        else:
+            rects = renderer.draw()
+        if recorder is not None:
+            recorder.add(gDisplay)
+            running = sorting
+        else:
+            if rects:
+                pygame.display.update(rects)
+            clock.tick(fps)
+
+    if sorter is not None:
+        sorter.close()
+    if recorder is not None:
+        recorder.close()
+        info("Recorded frames", frames=recorder.frames, path=record_path)
 
 if __name__ == "__main__":
     main()